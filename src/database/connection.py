@@ -1,213 +1,455 @@
 import pyodbc
 import logging
+import re
 from contextlib import contextmanager
-from typing import Generator, Optional, Any, List, Dict
+from functools import lru_cache
+from typing import Callable, Generator, Optional, Any, List, Dict, Tuple
 import time
 import threading
-from queue import Queue, Empty
-from datetime import datetime, timedelta
+from collections import deque
 from src.utils.config import get_settings
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+MAX_POOL_SHARDS = 8
+
+# Rows pulled from the driver per fetchmany() call
+FETCH_BATCH_SIZE = 1000
+
+# SQL Server errors for a USE target that does not exist (911) or cannot be opened (4060)
+_UNKNOWN_DATABASE_RE = re.compile(r"\((?:911|4060)\)")
+
+
+class DatabaseNotFoundError(LookupError):
+    """The requested database does not exist or cannot be opened."""
+
+
+@lru_cache(maxsize=128)
+def row_builder(columns: Tuple[str, ...]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Return a function turning a row into a dict keyed by `columns`.
+
+    The function is generated once per column layout as a single dict literal
+    ({'a': r[0], 'b': r[1], ...}), which skips the zip iterator dict(zip()) builds
+    per row. Column names are embedded with repr(), so any name is safe.
+    """
+    body = ", ".join(f"{name!r}: r[{i}]" for i, name in enumerate(columns))
+    namespace: Dict[str, Any] = {}
+    exec(f"def build(r): return {{{body}}}", namespace)
+    return namespace["build"]
+
+
+class _ConnEntry:
+    """A pooled connection and its bookkeeping (monotonic timestamps)."""
+    __slots__ = ('connection', 'created_at', 'last_used', 'validate_cursor', 'current_db')
+
+    def __init__(self, connection: pyodbc.Connection, current_db: Optional[str] = None):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # Created on the first liveness probe and reused by later ones
+        self.validate_cursor = None
+        # Database the session is on, so USE is only sent when it changes
+        self.current_db = current_db
+
+    def close(self):
+        """Close the validation cursor and the connection, ignoring errors."""
+        try:
+            if self.validate_cursor is not None:
+                self.validate_cursor.close()
+            self.connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing connection: {str(e)}")
+
+
 class ConnectionPool:
     """
     Thread-safe connection pool for pyodbc connections.
+
+    Idle connections are spread over up to MAX_POOL_SHARDS shards. A thread
+    leases from and returns to its own shard and only steals from the others
+    when its shard is empty. Each shard is a deque used as a LIFO stack, so the
+    most recently used (warmest) connection is handed out first.
+
+    Shards are not locked: deque append/pop are atomic in CPython. Returning a
+    connection therefore never blocks; only callers facing an exhausted pool
+    wait, on a Condition that releases signal when someone is waiting.
     """
 
     def __init__(self, connection_string: str, min_size: int = 2, max_size: int = 10,
-                 idle_timeout: int = 300, connection_lifetime: int = 1800):
+                 idle_timeout: int = 300, connection_lifetime: int = 1800,
+                 validation_idle_threshold: int = 30, acquire_timeout: int = 30,
+                 autocommit: bool = False, default_database: Optional[str] = None,
+                 session_init: Optional[str] = None):
         self.connection_string = connection_string
         self.min_size = min_size
         self.max_size = max_size
         self.idle_timeout = idle_timeout  # seconds before idle connection is closed
         self.connection_lifetime = connection_lifetime  # max lifetime of a connection
+        self.validation_idle_threshold = validation_idle_threshold  # idle seconds before a liveness probe
+        self.acquire_timeout = acquire_timeout  # max seconds to wait on an exhausted pool
+        self.autocommit = autocommit  # skip implicit transactions (read-only sessions)
+        self.default_database = default_database  # database new connections start on
+        self.session_init = session_init  # SET options run once on each new connection
 
-        self._pool = Queue(maxsize=max_size)
-        self._connection_count = 0
-        self._lock = threading.Lock()
+        self._shards = [deque() for _ in range(max(1, min(MAX_POOL_SHARDS, max_size)))]
+        # Only used by callers waiting on an exhausted pool
+        self._cv = threading.Condition()
+        self._waiters = 0
+        # One slot per open connection
+        self._slots = threading.BoundedSemaphore(max_size)
+        # Open connections, kept alongside the slots for stats and the evictor floor
+        self._open = 0
+        self._open_lock = threading.Lock()
 
         # Initialize minimum connections
         self._initialize_pool()
         logger.info(f"Connection pool initialized with min={min_size}, max={max_size}")
 
+        # Close connections idle longer than idle_timeout in the background
+        self._closed = threading.Event()
+        if idle_timeout > 0:
+            threading.Thread(target=self._evictor, name="mssql-pool-evictor", daemon=True).start()
+
     def _initialize_pool(self):
         """Create minimum number of connections at startup."""
-        with self._lock:
-            for _ in range(self.min_size):
-                try:
-                    conn_wrapper = self._create_connection()
-                    self._pool.put(conn_wrapper)
-                except Exception as e:
-                    logger.error(f"Failed to initialize connection: {str(e)}")
+        for _ in range(self.min_size):
+            if not self._acquire_slot():
+                break
+            try:
+                conn_wrapper = self._create_connection()
+                self._home_shard().append(conn_wrapper)
+            except Exception as e:
+                self._release_slot()
+                logger.error(f"Failed to initialize connection: {str(e)}")
 
-    def _create_connection(self) -> Dict[str, Any]:
+    def _create_connection(self) -> _ConnEntry:
         """Create a new connection with metadata."""
-        conn = pyodbc.connect(self.connection_string)
-        self._connection_count += 1
+        conn = pyodbc.connect(self.connection_string, autocommit=self.autocommit)
+        if self.session_init:
+            try:
+                conn.execute(self.session_init).close()
+            except Exception:
+                conn.close()
+                raise
+        return _ConnEntry(conn, self.default_database)
 
-        return {
-            'connection': conn,
-            'created_at': datetime.now(),
-            'last_used': datetime.now()
-        }
+    def _is_connection_valid(self, conn_wrapper: _ConnEntry) -> bool:
+        """
+        Check if connection is still valid and not expired.
 
-    def _is_connection_valid(self, conn_wrapper: Dict[str, Any]) -> bool:
-        """Check if connection is still valid and not expired."""
-        try:
-            # Check if connection is alive
-            cursor = conn_wrapper['connection'].cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
+        Recently used connections are trusted without a round-trip; the caller's
+        own query surfaces a dead connection. Only connections idle longer than
+        validation_idle_threshold are probed with SELECT 1.
+        """
+        conn = conn_wrapper.connection
+
+        # Check if connection has exceeded lifetime
+        if time.monotonic() - conn_wrapper.created_at > self.connection_lifetime:
+            logger.debug("Connection exceeded lifetime, will be replaced")
+            return False
 
-            # Check if connection has exceeded lifetime
-            age = datetime.now() - conn_wrapper['created_at']
-            if age.total_seconds() > self.connection_lifetime:
-                logger.debug("Connection exceeded lifetime, will be replaced")
-                return False
+        # Cheap client-side check, no server round-trip
+        if getattr(conn, 'closed', False):
+            return False
+
+        if time.monotonic() - conn_wrapper.last_used < self.validation_idle_threshold:
+            return True
 
+        try:
+            if conn_wrapper.validate_cursor is None:
+                conn_wrapper.validate_cursor = conn.cursor()
+            # Drain the result so the statement handle is free for the caller's query
+            conn_wrapper.validate_cursor.execute("SELECT 1").fetchall()
             return True
         except Exception as e:
             logger.debug(f"Connection validation failed: {str(e)}")
             return False
 
     @contextmanager
-    def get_connection(self) -> Generator[pyodbc.Connection, None, None]:
+    def get_connection(self, database: Optional[str] = None) -> Generator[pyodbc.Connection, None, None]:
         """
         Get a connection from the pool.
         Automatically returns it to the pool when done.
+
+        The connection is switched to `database`, or back to default_database when
+        not given, only if it is on a different one. Raises DatabaseNotFoundError if
+        the database does not exist or cannot be opened; the connection itself goes
+        back to the pool.
+        Any other error from the switch discards the connection.
         """
         conn_wrapper = None
 
         try:
-            # Try to get existing connection from pool
-            try:
-                conn_wrapper = self._pool.get(block=True, timeout=5)
-
-                # Validate connection
-                if not self._is_connection_valid(conn_wrapper):
-                    logger.debug("Replacing invalid connection")
-                    try:
-                        conn_wrapper['connection'].close()
-                    except:
-                        pass
-                    with self._lock:
-                        self._connection_count -= 1
-                    conn_wrapper = self._create_connection()
+            conn_wrapper = self._take_idle()
+            # Pool is empty, reserve a slot for a new connection if under max
+            if conn_wrapper is None and not self._acquire_slot():
+                conn_wrapper = self._wait_for_connection()
 
-            except Empty:
-                # Pool is empty, create new connection if under max
-                with self._lock:
-                    if self._connection_count < self.max_size:
-                        conn_wrapper = self._create_connection()
-                        logger.debug(f"Created new connection (total: {self._connection_count})")
-                    else:
-                        # Wait for a connection to become available
-                        logger.warning("Connection pool exhausted, waiting...")
-                        conn_wrapper = self._pool.get(block=True)
+            if conn_wrapper is None:
+                try:
+                    conn_wrapper = self._create_connection()
+                except Exception:
+                    self._release_slot()
+                    self._notify_waiter()
+                    raise
+                logger.debug(f"Created new connection (total: {self._total_connections()})")
+            elif not self._is_connection_valid(conn_wrapper):
+                logger.debug("Replacing invalid connection")
+                conn_wrapper.close()
+                # The replacement inherits the slot of the closed connection
+                conn_wrapper = self._create_connection()
 
-            # Update last used time
-            conn_wrapper['last_used'] = datetime.now()
+            target = database or self.default_database
+            if target and conn_wrapper.current_db != target and not self._use_database(conn_wrapper, target):
+                self._release(conn_wrapper)
+                conn_wrapper = None
+                raise DatabaseNotFoundError(f"Database not found: {target}")
 
             # Yield the actual connection
-            yield conn_wrapper['connection']
+            yield conn_wrapper.connection
 
-        except Exception as e:
-            logger.error(f"Error getting connection from pool: {str(e)}")
+        except BaseException as e:
+            # BaseException too: a generator abandoned mid-result (GeneratorExit)
+            # must still give its slot back
+            if not isinstance(e, GeneratorExit):
+                logger.error(f"Error getting connection from pool: {str(e)}")
             # If connection is bad, don't return it to pool
             if conn_wrapper:
-                try:
-                    conn_wrapper['connection'].close()
-                except:
-                    pass
-                with self._lock:
-                    self._connection_count -= 1
+                conn_wrapper.close()
+                self._release_slot()
+                self._notify_waiter()
             raise
         else:
-            # Return connection to pool
-            if conn_wrapper:
-                try:
-                    self._pool.put(conn_wrapper, block=False)
-                except:
-                    # Pool is full, close this connection
-                    try:
-                        conn_wrapper['connection'].close()
-                    except:
-                        pass
-                    with self._lock:
-                        self._connection_count -= 1
+            self._release(conn_wrapper)
+
+    def _release(self, conn_wrapper: _ConnEntry):
+        """Return a healthy connection to the calling thread's shard."""
+        conn_wrapper.last_used = time.monotonic()
+        self._home_shard().append(conn_wrapper)
+        self._notify_waiter()
+
+    def _use_database(self, conn_wrapper: _ConnEntry, database: str) -> bool:
+        """
+        Send USE for `database`; returns False if the database does not exist or
+        cannot be opened. Other errors (e.g. a broken link) are raised.
+        """
+        try:
+            # USE cannot take a parameter: it would run inside sp_executesql and not persist
+            conn_wrapper.connection.execute(f"USE [{database.replace(']', ']]')}]").close()
+        except pyodbc.Error as e:
+            if not _UNKNOWN_DATABASE_RE.search(str(e)):
+                raise
+            logger.warning(f"Could not switch to database {database}: {str(e)}")
+            return False
+        conn_wrapper.current_db = database
+        return True
+
+    def _home_shard(self) -> deque:
+        """Shard owned by the calling thread."""
+        # Native thread ids are small sequential integers, unlike get_ident()
+        # which returns aligned pointers that would all map to one shard
+        return self._shards[threading.get_native_id() % len(self._shards)]
+
+    def _take_idle(self) -> Optional[_ConnEntry]:
+        """Pop an idle connection from the caller's shard, stealing from the others if empty."""
+        shards = self._shards
+        home = threading.get_native_id() % len(shards)
+        for i in range(len(shards)):
+            try:
+                return shards[(home + i) % len(shards)].pop()
+            except IndexError:
+                continue
+        return None
+
+    def _wait_for_connection(self) -> Optional[_ConnEntry]:
+        """
+        Block until an idle connection or a free slot is available.
+        Returns the idle connection, or None if a slot was reserved instead.
+
+        Waiting is not fair: a released connection goes to whichever thread
+        gets to it first, including callers that never had to wait. Raises
+        TimeoutError after acquire_timeout seconds.
+        """
+        # Wait for a connection to become available
+        logger.warning("Connection pool exhausted, waiting...")
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cv:
+            # Registering before re-checking guarantees a release that misses
+            # the re-check sees the waiter and notifies it
+            self._waiters += 1
+            try:
+                while True:
+                    conn_wrapper = self._take_idle()
+                    if conn_wrapper is not None:
+                        return conn_wrapper
+                    if self._acquire_slot():
+                        return None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"Timed out after {self.acquire_timeout}s waiting for a database connection "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._cv.wait(timeout=remaining)
+            finally:
+                self._waiters -= 1
+
+    def _notify_waiter(self):
+        """Wake one waiting caller, if any, after a connection or slot was freed."""
+        if self._waiters:
+            with self._cv:
+                self._cv.notify()
 
     def close_all(self):
         """Close all connections in the pool."""
         logger.info("Closing all connections in pool")
-        while not self._pool.empty():
+        self._closed.set()
+        idle = []
+        for shard in self._shards:
+            while True:
+                try:
+                    idle.append(shard.popleft())
+                except IndexError:
+                    break
+        for conn_wrapper in idle:
+            self._release_slot()
+            conn_wrapper.close()
+
+    def _evictor(self):
+        """Background loop that periodically trims idle connections."""
+        interval = max(self.idle_timeout / 4, 1)
+        while not self._closed.wait(interval):
             try:
-                conn_wrapper = self._pool.get(block=False)
-                conn_wrapper['connection'].close()
-                with self._lock:
-                    self._connection_count -= 1
-            except Empty:
-                break
+                self._evict_idle()
             except Exception as e:
-                logger.error(f"Error closing connection: {str(e)}")
+                logger.error(f"Idle connection eviction failed: {str(e)}")
+
+    def _evict_idle(self):
+        """
+        Close pooled connections idle longer than idle_timeout, keeping at least min_size open.
+        Only connections sitting in the pool are touched, never ones leased to a caller.
+        """
+        evicted = 0
+        for shard in self._shards:
+            while self._total_connections() > self.min_size:
+                # Shards are LIFO stacks, so the longest-idle connection is at the left end
+                try:
+                    conn_wrapper = shard.popleft()
+                except IndexError:
+                    break
+                if time.monotonic() - conn_wrapper.last_used <= self.idle_timeout:
+                    shard.appendleft(conn_wrapper)
+                    break
+                conn_wrapper.close()
+                self._release_slot()
+                evicted += 1
+        if evicted:
+            logger.debug(f"Closed {evicted} idle connections (total: {self._total_connections()})")
+            self._notify_waiter()
+
+    def _acquire_slot(self) -> bool:
+        """Reserve a slot for a new connection without blocking; False if the pool is full."""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._open_lock:
+            self._open += 1
+        return True
+
+    def _release_slot(self):
+        """Give back the slot of a closed connection."""
+        with self._open_lock:
+            self._open -= 1
+        self._slots.release()
+
+    def _total_connections(self) -> int:
+        """Best-effort count of open connections, read without locking."""
+        return self._open
 
     def get_stats(self) -> Dict[str, Any]:
         """Get pool statistics."""
         return {
-            'total_connections': self._connection_count,
-            'available_connections': self._pool.qsize(),
+            'total_connections': self._total_connections(),
+            'available_connections': sum(len(shard) for shard in self._shards),
             'max_connections': self.max_size,
             'min_connections': self.min_size
         }
 
 
+_instance_lock = threading.Lock()
+
+
 class DatabaseConnection:
     _instance = None
     _pool = None
 
     def __init__(self):
+        # The pool is shared; settings and connection string are only needed to build it
+        if DatabaseConnection._pool is not None:
+            return
+
         self.settings = get_settings()
         self._connection_string = self._build_connection_string()
 
         # Initialize connection pool
-        if DatabaseConnection._pool is None:
-            DatabaseConnection._pool = ConnectionPool(
-                connection_string=self._connection_string,
-                min_size=self.settings.MIN_POOL_SIZE,
-                max_size=self.settings.MAX_POOL_SIZE,
-                idle_timeout=self.settings.IDLE_TIMEOUT,
-                connection_lifetime=self.settings.CONNECTION_LIFETIME
-            )
+        DatabaseConnection._pool = ConnectionPool(
+            connection_string=self._connection_string,
+            min_size=self.settings.MIN_POOL_SIZE,
+            max_size=self.settings.MAX_POOL_SIZE,
+            idle_timeout=self.settings.IDLE_TIMEOUT,
+            connection_lifetime=self.settings.CONNECTION_LIFETIME,
+            validation_idle_threshold=self.settings.VALIDATION_IDLE_THRESHOLD,
+            acquire_timeout=self.settings.POOL_ACQUIRE_TIMEOUT,
+            # Read-only sessions never need a transaction to commit
+            autocommit=not self.settings.MSSQL_ALLOW_WRITE_OPERATIONS,
+            default_database=self.settings.MSSQL_DATABASE,
+            # Row-count messages are pure overhead when nothing is written; write
+            # sessions keep them because cursor.rowcount reports rows affected
+            session_init=None if self.settings.MSSQL_ALLOW_WRITE_OPERATIONS else "SET NOCOUNT ON"
+        )
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls._instance = DatabaseConnection()
+            # Double-checked so concurrent first calls cannot build two pools
+            with _instance_lock:
+                if cls._instance is None:
+                    cls._instance = DatabaseConnection()
         return cls._instance
 
-    def _build_connection_string(self) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _build_connection_string() -> str:
+        """Build the ODBC connection string from settings once and reuse it."""
+        settings = get_settings()
         driver = "{ODBC Driver 18 for SQL Server}"
         # Construct connection string
         conn_str = (
             f"DRIVER={driver};"
-            f"SERVER={self.settings.MSSQL_HOST},{self.settings.MSSQL_PORT};"
-            f"DATABASE={self.settings.MSSQL_DATABASE};"
-            f"UID={self.settings.MSSQL_USER};"
-            f"PWD={self.settings.MSSQL_PASSWORD};"
-            f"Encrypt={'yes' if self.settings.MSSQL_ENCRYPT else 'no'};"
-            f"TrustServerCertificate={'yes' if self.settings.MSSQL_TRUST_SERVER_CERTIFICATE else 'no'};"
-            f"Connection Timeout={self.settings.MSSQL_CONNECTION_TIMEOUT};"
+            f"SERVER={settings.MSSQL_HOST},{settings.MSSQL_PORT};"
+            f"DATABASE={settings.MSSQL_DATABASE};"
+            f"UID={settings.MSSQL_USER};"
+            f"PWD={settings.MSSQL_PASSWORD};"
+            f"Encrypt={'yes' if settings.MSSQL_ENCRYPT else 'no'};"
+            f"TrustServerCertificate={'yes' if settings.MSSQL_TRUST_SERVER_CERTIFICATE else 'no'};"
+            f"Connection Timeout={settings.MSSQL_CONNECTION_TIMEOUT};"
         )
         return conn_str
 
     @contextmanager
-    def get_connection(self) -> Generator[pyodbc.Connection, None, None]:
+    def get_connection(self, timeout: Optional[int] = None,
+                       database: Optional[str] = None) -> Generator[pyodbc.Connection, None, None]:
         """
-        Yields a database connection from the connection pool.
-        The connection is automatically returned to the pool when done.
+        Yields a database connection from the connection pool, switched to `database`
+        (or MSSQL_DATABASE). The connection is automatically returned to the pool when done.
+
+        Cursors created from it get a server-side query timeout (SQL_ATTR_QUERY_TIMEOUT)
+        of `timeout` seconds, or MSSQL_REQUEST_TIMEOUT when not given; 0 disables it.
         """
-        with self._pool.get_connection() as conn:
+        with self._pool.get_connection(database) as conn:
+            # Set on every checkout: pooled connections keep whatever the last caller used
+            conn.timeout = get_settings().MSSQL_REQUEST_TIMEOUT if timeout is None else timeout
             yield conn
 
     def get_pool_stats(self) -> Dict[str, Any]:
@@ -218,28 +460,66 @@ class DatabaseConnection:
         """
         Executes a query and returns a list of dictionaries (rows).
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute(query, params)
                 
-                if cursor.description:
-                    columns = [column[0] for column in cursor.description]
-                    rows = []
-                    for row in cursor.fetchall():
-                        if dictionary:
-                            rows.append(dict(zip(columns, row)))
-                        else:
-                            rows.append(row)
-                    
-                    duration = time.time() - start_time
-                    logger.info(f"Query executed in {duration:.3f}s: {query[:50]}...")
-                    return rows
-                else:
-                    # No result set (e.g. INSERT/UPDATE)
-                    conn.commit()
+                if cursor.description is None:
+                    # No result set (e.g. INSERT/UPDATE); autocommit sessions are already committed
+                    if not conn.autocommit:
+                        conn.commit()
                     return [{"rows_affected": cursor.rowcount}]
+
+                columns = tuple(column[0] for column in cursor.description)
+                build = row_builder(columns)
+                rows = []
+                # Fetch in batches so pyodbc rows and built dicts never both
+                # hold the full result set
+                cursor.arraysize = FETCH_BATCH_SIZE
+                while True:
+                    batch = cursor.fetchmany(FETCH_BATCH_SIZE)
+                    if not batch:
+                        break
+                    if dictionary:
+                        rows.extend([build(row) for row in batch])
+                    else:
+                        rows.extend(batch)
+                
+                duration = time.monotonic() - start_time
+                logger.info(f"Query executed in {duration:.3f}s: {query[:50]}...")
+                return rows
+            except pyodbc.Error as e:
+                logger.error(f"Query execution error: {str(e)}")
+                raise
+            finally:
+                cursor.close()
+
+    def execute_multi(self, query: str, params: tuple = (), result_set_count: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Executes a batch of statements in one round-trip and returns every result set,
+        each as a list of dictionaries. Stops after result_set_count sets when given.
+        """
+        start_time = time.monotonic()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                result_sets = []
+                while True:
+                    if cursor.description is not None:
+                        columns = tuple(column[0] for column in cursor.description)
+                        build = row_builder(columns)
+                        result_sets.append([build(row) for row in cursor.fetchall()])
+                        if result_set_count is not None and len(result_sets) >= result_set_count:
+                            break
+                    if not cursor.nextset():
+                        break
+
+                duration = time.monotonic() - start_time
+                logger.info(f"Batch executed in {duration:.3f}s: {query[:50]}...")
+                return result_sets
             except pyodbc.Error as e:
                 logger.error(f"Query execution error: {str(e)}")
                 raise
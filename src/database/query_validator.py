@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import Tuple, Optional
 
 class QueryValidator:
@@ -24,36 +25,73 @@ class QueryValidator:
         Validates a query string.
         Returns: (is_valid, error_message)
         """
-        if not query or not query.strip():
-            return False, "Query cannot be empty"
+        return _validate_cached(query, self.allow_write)
 
-        # Check for multiple statements
-        if re.search(self.MULTI_STATEMENT_PATTERN, query):
-             return False, "Multiple statements are not allowed"
+    def is_select_statement(self, query: str) -> bool:
+        return _SELECT_PREFIX_RE.match(query) is not None
 
-        normalized_query = query.upper()
-        
-        # If write operations are not allowed, enforce strictly read-only
-        if not self.allow_write:
-            # Must start with SELECT or WITH (for CTEs)
-            if not (normalized_query.strip().startswith("SELECT") or 
-                    normalized_query.strip().startswith("WITH")):
-                
-                # Check for INSERT/UPDATE explicitly if it didn't start with SELECT
-                if "INSERT" in normalized_query or "UPDATE" in normalized_query:
-                     return False, "Write operations (INSERT, UPDATE) are not allowed in read-only mode"
-                
-                # Check other dangerous patterns
-                for pattern in self.DANGEROUS_PATTERNS:
-                    if re.search(pattern, normalized_query, re.IGNORECASE):
-                        return False, f"Operation not allowed: {pattern.replace(r'\\b', '')}"
-            
-            # Double check for dangerous keywords even in SELECTs (e.g. into outfile, subqueries with exec)
-            # This is a basic check; parameterized queries are the real defense
-            if "xp_cmdshell" in query.lower():
-                return False, "Dangerous stored procedure execution is not allowed"
 
-        return True, None
+@lru_cache(maxsize=2)
+def get_validator(allow_write: bool = False) -> QueryValidator:
+    """Shared validator per write mode, so callers don't rebuild one per request."""
+    return QueryValidator(allow_write=allow_write)
 
-    def is_select_statement(self, query: str) -> bool:
-        return query.strip().upper().startswith("SELECT") or query.strip().upper().startswith("WITH")
+
+# Compiled once at import; DANGEROUS_PATTERNS unioned into one alternation
+_DANGEROUS_RE = re.compile(
+    r"\b(?:" + "|".join(p.replace(r"\b", "") for p in QueryValidator.DANGEROUS_PATTERNS) + r")\b",
+    re.IGNORECASE,
+)
+_MULTI_STATEMENT_RE = re.compile(QueryValidator.MULTI_STATEMENT_PATTERN)
+_SELECT_PREFIX_RE = re.compile(r"\s*(?:SELECT|WITH)", re.IGNORECASE)
+_WRITE_KEYWORD_RE = re.compile(r"INSERT|UPDATE", re.IGNORECASE)
+_XP_CMDSHELL_RE = re.compile(r"xp_cmdshell", re.IGNORECASE)
+# String literals, comments and quoted identifiers, blanked before keyword scans
+_NON_CODE_RE = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/|\[[^\]]*\]|\"[^\"]*\"", re.DOTALL)
+# Keywords with no place in a read-only SELECT: a CTE can front any DML, and
+# SELECT ... INTO creates and fills a table
+_READ_ONLY_FORBIDDEN_RE = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|MERGE|INTO|DROP|CREATE|ALTER|TRUNCATE|GRANT|REVOKE|EXEC|EXECUTE)\b",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=1024)
+def _validate_cached(query: str, allow_write: bool) -> Tuple[bool, Optional[str]]:
+    """
+    Validation logic behind QueryValidator.validate_query.
+    Pure function of its arguments, memoized so repeated queries skip the regex work.
+    """
+    if not query or query.isspace():
+        return False, "Query cannot be empty"
+
+    # Check for multiple statements
+    if _MULTI_STATEMENT_RE.search(query):
+         return False, "Multiple statements are not allowed"
+
+    # If write operations are not allowed, enforce strictly read-only
+    # Case-insensitive regexes avoid allocating an uppercased copy of the query
+    if not allow_write:
+        # Must start with SELECT or WITH (for CTEs)
+        if not _SELECT_PREFIX_RE.match(query):
+            
+            # Check for INSERT/UPDATE explicitly if it didn't start with SELECT
+            if _WRITE_KEYWORD_RE.search(query):
+                 return False, "Write operations (INSERT, UPDATE) are not allowed in read-only mode"
+            
+            # Check other dangerous patterns in a single scan
+            match = _DANGEROUS_RE.search(query)
+            if match:
+                return False, f"Operation not allowed: {match.group(0).upper()}"
+        else:
+            # Read-only sessions autocommit, so anything let through here is permanent
+            match = _READ_ONLY_FORBIDDEN_RE.search(_NON_CODE_RE.sub(" ", query))
+            if match:
+                return False, f"Operation not allowed in read-only mode: {match.group(0).upper()}"
+        
+        # Double check for dangerous keywords even in SELECTs (e.g. into outfile, subqueries with exec)
+        # This is a basic check; parameterized queries are the real defense
+        if _XP_CMDSHELL_RE.search(query):
+            return False, "Dangerous stored procedure execution is not allowed"
+
+    return True, None
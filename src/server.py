@@ -1,5 +1,6 @@
 import asyncio
-import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from mcp.server.models import InitializationOptions
 import mcp.types as types
@@ -8,10 +9,18 @@ import mcp.server.stdio
 from pydantic import AnyUrl
 
 from src.tools.query import execute_query, QueryParams
-from src.tools.introspection import list_databases, list_tables, describe_table, ListTablesParams, DescribeTableParams
-from src.tools.advanced import execute_procedure, execute_write, ExecuteProcedureParams, ExecuteWriteParams
+from src.tools.introspection import (
+    list_databases, list_tables, describe_table, describe_tables_bulk,
+    ListTablesParams, DescribeTableParams, DescribeTablesParams, MAX_DESCRIBE_TABLES,
+)
+from src.tools.advanced import (
+    execute_procedure, execute_write, execute_bulk_write,
+    ExecuteProcedureParams, ExecuteWriteParams, ExecuteBulkWriteParams,
+)
 from src.database.connection import get_pool_stats
+from src.utils.config import get_settings
 from src.utils.logging import setup_logging, get_logger
+from src.utils.serialization import dumps
 
 # Initialize logging
 setup_logging()
@@ -20,132 +29,180 @@ logger = get_logger(__name__)
 # Create Server instance
 server = Server("mssql-mcp-server")
 
+# Tool definitions are static, so schemas are generated once at import
+_EMPTY_INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {},
+}
+
+_TOOLS = [
+    types.Tool(
+        name="mssql_query",
+        description="Execute a SQL query (SELECT only by default) against the database.",
+        inputSchema=QueryParams.model_json_schema(),
+    ),
+    types.Tool(
+        name="mssql_list_databases",
+        description="List all accessible databases on the server.",
+        inputSchema=_EMPTY_INPUT_SCHEMA,
+    ),
+    types.Tool(
+        name="mssql_list_tables",
+        description="List all tables in a specific database and schema.",
+        inputSchema=ListTablesParams.model_json_schema(),
+    ),
+    types.Tool(
+        name="mssql_describe_table",
+        description="Get detailed schema information for a specific table.",
+        inputSchema=DescribeTableParams.model_json_schema(),
+    ),
+    types.Tool(
+        name="mssql_describe_tables",
+        description="Get detailed schema information for several tables in one call.",
+        inputSchema=DescribeTablesParams.model_json_schema(),
+    ),
+    types.Tool(
+        name="mssql_pool_stats",
+        description="Get connection pool statistics for monitoring performance.",
+        inputSchema=_EMPTY_INPUT_SCHEMA,
+    ),
+    types.Tool(
+        name="mssql_execute_procedure",
+        description="Execute a stored procedure with parameters (requires MSSQL_ALLOW_WRITE_OPERATIONS=true).",
+        inputSchema=ExecuteProcedureParams.model_json_schema(),
+    ),
+    types.Tool(
+        name="mssql_execute_write",
+        description="Execute INSERT, UPDATE, DELETE statements (requires MSSQL_ALLOW_WRITE_OPERATIONS=true).",
+        inputSchema=ExecuteWriteParams.model_json_schema(),
+    ),
+    types.Tool(
+        name="mssql_execute_bulk_write",
+        description="Execute one parameterized INSERT, UPDATE or DELETE for many rows in a single transaction (requires MSSQL_ALLOW_WRITE_OPERATIONS=true).",
+        inputSchema=ExecuteBulkWriteParams.model_json_schema(),
+    ),
+]
+
 @server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
-    return [
-        types.Tool(
-            name="mssql_query",
-            description="Execute a SQL query (SELECT only by default) against the database.",
-            inputSchema=QueryParams.model_json_schema(),
-        ),
-        types.Tool(
-            name="mssql_list_databases",
-            description="List all accessible databases on the server.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-            },
-        ),
-        types.Tool(
-            name="mssql_list_tables",
-            description="List all tables in a specific database and schema.",
-            inputSchema=ListTablesParams.model_json_schema(),
-        ),
-        types.Tool(
-            name="mssql_describe_table",
-            description="Get detailed schema information for a specific table.",
-            inputSchema=DescribeTableParams.model_json_schema(),
-        ),
-        types.Tool(
-            name="mssql_pool_stats",
-            description="Get connection pool statistics for monitoring performance.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-            },
-        ),
-        types.Tool(
-            name="mssql_execute_procedure",
-            description="Execute a stored procedure with parameters (requires MSSQL_ALLOW_WRITE_OPERATIONS=true).",
-            inputSchema=ExecuteProcedureParams.model_json_schema(),
-        ),
-        types.Tool(
-            name="mssql_execute_write",
-            description="Execute INSERT, UPDATE, DELETE statements (requires MSSQL_ALLOW_WRITE_OPERATIONS=true).",
-            inputSchema=ExecuteWriteParams.model_json_schema(),
-        ),
-    ]
+    return _TOOLS
+
+def _text(text: str) -> list[types.TextContent]:
+    return [types.TextContent(type="text", text=text)]
+
+async def _handle_query(arguments: dict) -> list[types.TextContent]:
+    # Extract params manually to ensure defaults work if not provided
+    query = arguments.get("query")
+    database = arguments.get("database")
+    max_rows = arguments.get("max_rows", 1000)
+    dictionary = arguments.get("dictionary", False)
+    
+    if not query:
+        raise ValueError("Query is required")
+        
+    result = await asyncio.to_thread(execute_query, query, database, max_rows, dictionary)
+    
+    # If result has 'error' key, we might want to return it clearly
+    if not result.get("success", True):
+         return _text(f"Error: {result.get('error')}")
+         
+    # Format results as JSON string
+    return _text(dumps(result))
+
+async def _handle_list_databases(arguments: dict) -> list[types.TextContent]:
+    result = await asyncio.to_thread(list_databases)
+    return _text(dumps({"databases": result}))
+
+async def _handle_list_tables(arguments: dict) -> list[types.TextContent]:
+    # schema is optional, default 'dbo'
+    schema = arguments.get("schema", "dbo")
+    database = arguments.get("database")
+    result = await asyncio.to_thread(list_tables, schema, database)
+    return _text(dumps({"tables": result}))
+
+async def _handle_describe_table(arguments: dict) -> list[types.TextContent]:
+    table_name = arguments.get("table_name")
+    if not table_name:
+        raise ValueError("table_name is required")
+    schema = arguments.get("schema", "dbo")
+    database = arguments.get("database")
+    result = await asyncio.to_thread(describe_table, table_name, schema, database)
+    return _text(dumps(result))
+
+async def _handle_describe_tables(arguments: dict) -> list[types.TextContent]:
+    table_names = arguments.get("table_names")
+    if not table_names:
+        raise ValueError("table_names is required")
+    # A bare string would otherwise be described one character at a time
+    if not isinstance(table_names, list) or not all(isinstance(name, str) and name for name in table_names):
+        raise ValueError("table_names must be a list of non-empty strings")
+    if len(table_names) > MAX_DESCRIBE_TABLES:
+        raise ValueError(f"table_names accepts at most {MAX_DESCRIBE_TABLES} tables")
+    schema = arguments.get("schema", "dbo")
+    database = arguments.get("database")
+    result = await asyncio.to_thread(describe_tables_bulk, table_names, schema, database)
+    return _text(dumps({"tables": result}))
+
+async def _handle_pool_stats(arguments: dict) -> list[types.TextContent]:
+    stats = await asyncio.to_thread(get_pool_stats)
+    return _text(dumps(stats))
+
+async def _handle_execute_procedure(arguments: dict) -> list[types.TextContent]:
+    procedure_name = arguments.get("procedure_name")
+    if not procedure_name:
+        raise ValueError("procedure_name is required")
+    parameters = arguments.get("parameters")
+    database = arguments.get("database")
+    timeout = arguments.get("timeout", 30)
+    result = await asyncio.to_thread(execute_procedure, procedure_name, parameters, database, timeout)
+    return _text(dumps(result))
+
+async def _handle_execute_write(arguments: dict) -> list[types.TextContent]:
+    statement = arguments.get("statement")
+    if not statement:
+        raise ValueError("statement is required")
+    database = arguments.get("database")
+    dry_run = arguments.get("dry_run", False)
+    result = await asyncio.to_thread(execute_write, statement, database, dry_run)
+    return _text(dumps(result))
+
+async def _handle_execute_bulk_write(arguments: dict) -> list[types.TextContent]:
+    statement = arguments.get("statement")
+    if not statement:
+        raise ValueError("statement is required")
+    rows = arguments.get("rows")
+    if rows is None:
+        raise ValueError("rows is required")
+    database = arguments.get("database")
+    result = await asyncio.to_thread(execute_bulk_write, statement, rows, database)
+    return _text(dumps(result))
+
+# Tool name -> handler, looked up once per call
+_TOOL_HANDLERS = {
+    "mssql_query": _handle_query,
+    "mssql_list_databases": _handle_list_databases,
+    "mssql_list_tables": _handle_list_tables,
+    "mssql_describe_table": _handle_describe_table,
+    "mssql_describe_tables": _handle_describe_tables,
+    "mssql_pool_stats": _handle_pool_stats,
+    "mssql_execute_procedure": _handle_execute_procedure,
+    "mssql_execute_write": _handle_execute_write,
+    "mssql_execute_bulk_write": _handle_execute_bulk_write,
+}
 
 @server.call_tool()
 async def handle_call_tool(
     name: str, arguments: dict | None
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-    if not arguments:
-        arguments = {}
-        
     try:
-        if name == "mssql_query":
-            # Extract params manually to ensure defaults work if not provided
-            query = arguments.get("query")
-            database = arguments.get("database")
-            max_rows = arguments.get("max_rows", 1000)
-            
-            if not query:
-                raise ValueError("Query is required")
-                
-            result = execute_query(query, database, max_rows)
-            
-            # If result has 'error' key, we might want to return it clearly
-            if not result.get("success", True):
-                 return [types.TextContent(type="text", text=f"Error: {result.get('error')}")]
-                 
-            # Format results as JSON string
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(result, default=str, indent=2)
-                )
-            ]
-            
-        elif name == "mssql_list_databases":
-            result = list_databases()
-            return [types.TextContent(type="text", text=json.dumps({"databases": result}, default=str, indent=2))]
-            
-        elif name == "mssql_list_tables":
-            # schema is optional, default 'dbo'
-            schema = arguments.get("schema", "dbo")
-            database = arguments.get("database")
-            result = list_tables(schema, database)
-            return [types.TextContent(type="text", text=json.dumps({"tables": result}, default=str, indent=2))]
-            
-        elif name == "mssql_describe_table":
-            table_name = arguments.get("table_name")
-            if not table_name:
-                raise ValueError("table_name is required")
-            schema = arguments.get("schema", "dbo")
-            database = arguments.get("database")
-            result = describe_table(table_name, schema, database)
-            return [types.TextContent(type="text", text=json.dumps(result, default=str, indent=2))]
-
-        elif name == "mssql_pool_stats":
-            stats = get_pool_stats()
-            return [types.TextContent(type="text", text=json.dumps(stats, default=str, indent=2))]
-
-        elif name == "mssql_execute_procedure":
-            procedure_name = arguments.get("procedure_name")
-            if not procedure_name:
-                raise ValueError("procedure_name is required")
-            parameters = arguments.get("parameters")
-            database = arguments.get("database")
-            timeout = arguments.get("timeout", 30)
-            result = execute_procedure(procedure_name, parameters, database, timeout)
-            return [types.TextContent(type="text", text=json.dumps(result, default=str, indent=2))]
-
-        elif name == "mssql_execute_write":
-            statement = arguments.get("statement")
-            if not statement:
-                raise ValueError("statement is required")
-            database = arguments.get("database")
-            dry_run = arguments.get("dry_run", False)
-            result = execute_write(statement, database, dry_run)
-            return [types.TextContent(type="text", text=json.dumps(result, default=str, indent=2))]
-
-        else:
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {name}")
+        return await handler(arguments or {})
 
     except Exception as e:
         logger.error(f"Error executing tool {name}: {str(e)}")
-        return [types.TextContent(type="text", text=f"Error: {str(e)}")]
+        return _text(f"Error: {str(e)}")
 
 @server.list_resources()
 async def handle_list_resources() -> list[types.Resource]:
@@ -155,34 +212,41 @@ async def handle_list_resources() -> list[types.Resource]:
     # We will implement a few examples or just leave it dynamic via URI patterns
     return []
 
+# Parsed in a single pass; anything else (unknown type, extra segments) is rejected
+_RESOURCE_URI_RE = re.compile(
+    r"mssql://(?P<type>schema|sample)/(?P<database>[^/]+)/(?P<schema>[^/]+)(?:/(?P<table>[^/]+))?$"
+)
+
 @server.read_resource()
 async def handle_read_resource(uri: AnyUrl) -> str | bytes:
     # URI format: mssql://schema/{database}/{schema}
     # URI format: mssql://sample/{database}/{schema}/{table}
     
-    parsed_path = str(uri).replace("mssql://", "")
-    parts = parsed_path.split("/")
-    
-    resource_type = parts[0]
+    match = _RESOURCE_URI_RE.match(str(uri))
+    if not match:
+        raise ValueError(f"Invalid resource URI: {uri}")
+    resource_type, database, schema, table = match.group("type", "database", "schema", "table")
     
     if resource_type == "schema":
-        if len(parts) < 3:
+        if table is not None:
             raise ValueError("Invalid schema URI. Expected: mssql://schema/{database}/{schema}")
-        database, schema = parts[1], parts[2]
-        tables = list_tables(schema, database)
-        return json.dumps(tables, default=str, indent=2)
+        tables = await asyncio.to_thread(list_tables, schema, database)
+        return dumps(tables)
         
-    elif resource_type == "sample":
-        if len(parts) < 4:
-            raise ValueError("Invalid sample URI. Expected: mssql://sample/{database}/{schema}/{table}")
-        database, schema, table = parts[1], parts[2], parts[3]
-        query = f"SELECT TOP 10 * FROM [{database}].[{schema}].[{table}]"
-        result = execute_query(query, database, 10)
-        return json.dumps(result, default=str, indent=2)
-        
-    raise ValueError(f"Unknown resource type: {resource_type}")
+    # resource_type == "sample"
+    if table is None:
+        raise ValueError("Invalid sample URI. Expected: mssql://sample/{database}/{schema}/{table}")
+    query = f"SELECT TOP 10 * FROM [{database}].[{schema}].[{table}]"
+    result = await asyncio.to_thread(execute_query, query, database, 10)
+    return dumps(result)
 
 async def main():
+    # Blocking pyodbc work runs in the default executor via asyncio.to_thread;
+    # size it to the pool so every worker thread can hold a connection
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=get_settings().MAX_POOL_SIZE)
+    )
+
     # Run the server using stdin/stdout streams
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
@@ -2,22 +2,31 @@
 Advanced database operation tools (stored procedures and write operations).
 These tools require explicit configuration to enable.
 """
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Callable, Dict, List, Optional
 from pydantic import BaseModel, Field
 import time
-from src.database.connection import get_db_connection
-from src.database.query_validator import QueryValidator
+from src.database.connection import get_db_connection, row_builder, DatabaseNotFoundError, FETCH_BATCH_SIZE
+from src.database.query_validator import get_validator
+from src.tools.introspection import invalidate_schema_cache
 from src.utils.config import get_settings
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Letter or underscore, then alphanumerics/underscores
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Quoted string literals, removed before counting parameter markers
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+# Leading DML keyword; matching in place avoids copying the whole statement
+_DML_RE = re.compile(r"\s*(?:INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
 
 class ExecuteProcedureParams(BaseModel):
     procedure_name: str = Field(..., description="Stored procedure name (schema.procedure)")
     parameters: Optional[Dict[str, Any]] = Field(None, description="Named parameters as key-value pairs")
     database: Optional[str] = Field(None, description="Target database (optional)")
-    timeout: int = Field(30, description="Execution timeout in seconds (max 300)")
+    timeout: int = Field(30, description="Execution timeout in seconds (1-300)")
 
 
 class ExecuteWriteParams(BaseModel):
@@ -26,6 +35,12 @@ class ExecuteWriteParams(BaseModel):
     dry_run: bool = Field(False, description="Validate without executing")
 
 
+class ExecuteBulkWriteParams(BaseModel):
+    statement: str = Field(..., description="Parameterized DML statement using ? markers, e.g. INSERT INTO t (a, b) VALUES (?, ?)")
+    rows: List[List[Any]] = Field(..., description="One array of values per execution, matching the ? markers in order")
+    database: Optional[str] = Field(None, description="Target database (optional)")
+
+
 def execute_procedure(
     procedure_name: str,
     parameters: Optional[Dict[str, Any]] = None,
@@ -60,10 +75,11 @@ def execute_procedure(
             "success": False
         }
 
-    # Validate timeout
+    # Validate timeout: 0 would disable the query timeout and a negative value
+    # makes pyodbc raise after a connection is already checked out
     if timeout > 300:
-        timeout = 300
         logger.warning(f"Timeout capped at 300 seconds")
+    timeout = max(1, min(int(timeout), 300))
 
     # Validate procedure name format (schema.procedure or just procedure)
     if not _is_valid_identifier(procedure_name):
@@ -72,53 +88,56 @@ def execute_procedure(
             "success": False
         }
 
+    # Parameter names are placed in the call text, so hold them to identifier rules
+    if parameters:
+        for key in parameters:
+            if not _IDENT_RE.fullmatch(key):
+                return {
+                    "error": f"Invalid parameter name: {key}",
+                    "success": False
+                }
+
     db = get_db_connection()
-    start_time = time.time()
+    start_time = time.monotonic()
 
     # Audit logging
     logger.info(f"Executing stored procedure: {procedure_name} with params: {parameters}")
 
     try:
-        with db.get_connection() as conn:
+        with db.get_connection(timeout=timeout, database=database) as conn:
             cursor = conn.cursor()
 
-            # Switch database if specified
-            if database:
-                # Validate database exists
-                cursor.execute("SELECT name FROM sys.databases WHERE name = ?", (database,))
-                if not cursor.fetchone():
-                    return {
-                        "error": f"Database not found: {database}",
-                        "success": False
-                    }
-                cursor.execute(f"USE [{database}]")
-
-            # Build EXEC statement with parameters
+            # ODBC call escape: the driver sends an RPC request instead of a
+            # language batch, so the server skips parsing and reuses the plan
             if parameters:
                 # Build parameter list
                 param_list = []
                 param_values = []
                 for key, value in parameters.items():
-                    param_list.append(f"@{key} = ?")
+                    param_list.append(f"@{key}=?")
                     param_values.append(value)
 
-                exec_statement = f"EXEC {procedure_name} {', '.join(param_list)}"
-                cursor.execute(exec_statement, tuple(param_values))
+                call_statement = f"{{call {procedure_name}({', '.join(param_list)})}}"
+                cursor.execute(call_statement, tuple(param_values))
             else:
                 # Execute without parameters
-                cursor.execute(f"EXEC {procedure_name}")
+                cursor.execute(f"{{call {procedure_name}}}")
 
             # Fetch all result sets
             result_sets = []
+            # One driver fetch per batch instead of the default single row
+            cursor.arraysize = FETCH_BATCH_SIZE
             while True:
                 if cursor.description:
                     columns = [column[0] for column in cursor.description]
+                    # Row-to-dict function generated once per column layout
+                    build = row_builder(tuple(columns))
                     rows = []
-                    for row in cursor.fetchall():
-                        row_dict = {}
-                        for i, val in enumerate(row):
-                            row_dict[columns[i]] = val
-                        rows.append(row_dict)
+                    # Batched fetches bound driver-side buffering for large result sets
+                    batch = cursor.fetchmany(FETCH_BATCH_SIZE)
+                    while batch:
+                        rows.extend([build(row) for row in batch])
+                        batch = cursor.fetchmany(FETCH_BATCH_SIZE)
                     result_sets.append({
                         "columns": columns,
                         "rows": rows,
@@ -131,8 +150,9 @@ def execute_procedure(
 
             # Commit transaction
             conn.commit()
+            invalidate_schema_cache()
 
-            execution_time = time.time() - start_time
+            execution_time = time.monotonic() - start_time
 
             result = {
                 "procedure": procedure_name,
@@ -145,6 +165,12 @@ def execute_procedure(
             logger.info(f"Stored procedure executed successfully in {execution_time:.3f}s")
             return result
 
+    except DatabaseNotFoundError as e:
+        # Unknown database; nothing was executed
+        return {
+            "error": str(e),
+            "success": False
+        }
     except Exception as e:
         logger.error(f"Stored procedure execution failed: {str(e)}")
         return {
@@ -177,6 +203,96 @@ def execute_write(
     Returns:
         Dictionary containing rows affected, execution time, and validation results
     """
+    failure = _check_write_statement(statement)
+    if failure:
+        return failure
+
+    # Dry run mode - just validate and return
+    if dry_run:
+        logger.info(f"Dry-run validation successful for: {statement[:100]}...")
+        return {
+            "statement": statement,
+            "validation": "passed",
+            "dry_run": True,
+            "success": True,
+            "message": "Statement is valid and would execute successfully"
+        }
+
+    # Audit logging
+    logger.warning(f"Executing write operation: {statement[:200]}...")
+
+    result = _execute_in_transaction(statement, database, lambda cursor: cursor.execute(statement))
+    if result["success"]:
+        logger.warning(
+            f"Write operation completed: {result['rows_affected']} rows affected in {result['execution_time']:.3f}s"
+        )
+    return result
+
+
+def execute_bulk_write(
+    statement: str,
+    rows: List[List[Any]],
+    database: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Execute one parameterized DML statement for many rows in a single transaction.
+
+    Uses pyodbc's fast_executemany, which sends the parameter rows to the server
+    as bulk arrays instead of one round-trip per row. Same controls as execute_write.
+
+    Args:
+        statement: DML statement with ? parameter markers
+        rows: Parameter values, one list per row
+        database: Optional database to switch to
+
+    Returns:
+        Dictionary containing row count, rows affected and execution time
+    """
+    failure = _check_write_statement(statement)
+    if failure:
+        return failure
+
+    # Values must come in through the markers, one per column of every row
+    marker_count = _STRING_LITERAL_RE.sub("", statement).count("?")
+    if marker_count == 0:
+        return {
+            "error": "Statement must use ? parameter markers for row values",
+            "success": False,
+            "validation": "failed"
+        }
+    if not rows:
+        return {
+            "error": "rows must contain at least one row",
+            "success": False,
+            "validation": "failed"
+        }
+    for index, row in enumerate(rows):
+        if len(row) != marker_count:
+            return {
+                "error": f"Row {index} has {len(row)} values, statement expects {marker_count}",
+                "success": False,
+                "validation": "failed"
+            }
+
+    # Audit logging
+    logger.warning(f"Executing bulk write operation ({len(rows)} rows): {statement[:200]}...")
+
+    def run(cursor):
+        cursor.fast_executemany = True
+        cursor.executemany(statement, rows)
+
+    result = _execute_in_transaction(statement, database, run)
+    if result["success"]:
+        result["row_count"] = len(rows)
+        logger.warning(f"Bulk write completed: {len(rows)} rows in {result['execution_time']:.3f}s")
+    return result
+
+
+def _check_write_statement(statement: str) -> Optional[Dict[str, Any]]:
+    """
+    Checks shared by the write tools: writes enabled, statement passes the
+    validator and is DML. Returns the error response, or None if it may run.
+    """
     settings = get_settings()
 
     # Security check: Require explicit enable
@@ -188,7 +304,7 @@ def execute_write(
         }
 
     # Validate statement
-    validator = QueryValidator(allow_write=True)
+    validator = get_validator(allow_write=True)
     is_valid, error = validator.validate_query(statement)
 
     if not is_valid:
@@ -199,79 +315,70 @@ def execute_write(
         }
 
     # Check that it's actually a write operation
-    normalized = statement.strip().upper()
-    if not (normalized.startswith("INSERT") or
-            normalized.startswith("UPDATE") or
-            normalized.startswith("DELETE")):
+    if not _is_dml(statement):
         return {
             "error": "Only INSERT, UPDATE, DELETE statements are allowed",
             "success": False,
             "validation": "failed"
         }
 
-    # Dry run mode - just validate and return
-    if dry_run:
-        logger.info(f"Dry-run validation successful for: {statement[:100]}...")
-        return {
-            "statement": statement,
-            "validation": "passed",
-            "dry_run": True,
-            "success": True,
-            "message": "Statement is valid and would execute successfully"
-        }
+    return None
 
-    # Execute the write operation
-    db = get_db_connection()
-    start_time = time.time()
 
-    # Audit logging
-    logger.warning(f"Executing write operation: {statement[:200]}...")
+def _execute_in_transaction(
+    statement: str,
+    database: Optional[str],
+    run: Callable[[Any], Any]
+) -> Dict[str, Any]:
+    """
+    Call run(cursor) on a pooled connection and commit. Any error rolls the
+    transaction back and is returned as the error response.
+    """
+    db = get_db_connection()
+    start_time = time.monotonic()
+    summary = statement[:200] + "..." if len(statement) > 200 else statement
 
     try:
-        with db.get_connection() as conn:
+        with db.get_connection(database=database) as conn:
             cursor = conn.cursor()
 
-            # Switch database if specified
-            if database:
-                # Validate database exists
-                cursor.execute("SELECT name FROM sys.databases WHERE name = ?", (database,))
-                if not cursor.fetchone():
-                    return {
-                        "error": f"Database not found: {database}",
-                        "success": False
-                    }
-                cursor.execute(f"USE [{database}]")
-
             # Execute in transaction (automatic with pyodbc)
-            cursor.execute(statement)
+            run(cursor)
             rows_affected = cursor.rowcount
 
             # Commit transaction
             conn.commit()
+            invalidate_schema_cache()
 
-            execution_time = time.time() - start_time
-
-            result = {
-                "statement": statement[:200] + "..." if len(statement) > 200 else statement,
+            return {
+                "statement": summary,
                 "rows_affected": rows_affected,
-                "execution_time": execution_time,
+                "execution_time": time.monotonic() - start_time,
                 "success": True
             }
 
-            logger.warning(f"Write operation completed: {rows_affected} rows affected in {execution_time:.3f}s")
-            return result
-
+    except DatabaseNotFoundError as e:
+        # Unknown database; nothing was executed
+        return {
+            "error": str(e),
+            "success": False
+        }
     except Exception as e:
         logger.error(f"Write operation failed: {str(e)}")
         # Transaction automatically rolled back on exception
         return {
             "error": str(e),
-            "statement": statement[:200] + "..." if len(statement) > 200 else statement,
+            "statement": summary,
             "success": False,
             "rollback": True
         }
 
 
+def _is_dml(statement: str) -> bool:
+    """Check the statement starts with INSERT, UPDATE or DELETE."""
+    return _DML_RE.match(statement) is not None
+
+
 def _is_valid_identifier(name: str) -> bool:
     """
     Validate SQL identifier (procedure/table name).
@@ -286,13 +393,5 @@ def _is_valid_identifier(name: str) -> bool:
     if len(parts) > 2:
         return False
 
-    # Check each part is valid identifier
-    for part in parts:
-        part = part.strip('[]')  # Allow bracketed identifiers
-        if not part:
-            return False
-        # Allow alphanumeric and underscore
-        if not all(c.isalnum() or c == '_' for c in part):
-            return False
-
-    return True
+    # Check each part is valid identifier (brackets allowed around each part)
+    return all(_IDENT_RE.fullmatch(part.strip('[]')) for part in parts)
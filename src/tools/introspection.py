@@ -1,10 +1,48 @@
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+import time
 from pydantic import BaseModel, Field
 from src.database.connection import get_db_connection
+from src.utils.config import get_settings
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+SCHEMA_CACHE_MAXSIZE = 256
+
+# (func_name, *args) -> (expires_at, result); catalog data changes rarely
+_schema_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_schema_cache_lock = threading.Lock()
+
+def _ttl_cached(func: Callable) -> Callable:
+    """Serve repeat calls from memory for SCHEMA_CACHE_TTL seconds."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        ttl = get_settings().SCHEMA_CACHE_TTL
+        if ttl <= 0:
+            return func(*args, **kwargs)
+        key = (func.__name__,) + args + tuple(sorted(kwargs.items()))
+        now = time.monotonic()
+        with _schema_cache_lock:
+            entry = _schema_cache.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        result = func(*args, **kwargs)
+        with _schema_cache_lock:
+            if key not in _schema_cache and len(_schema_cache) >= SCHEMA_CACHE_MAXSIZE:
+                # Dicts keep insertion order, so the first key is the oldest entry
+                del _schema_cache[next(iter(_schema_cache))]
+            _schema_cache[key] = (now + ttl, result)
+        return result
+    return wrapper
+
+def invalidate_schema_cache() -> None:
+    """Drop all cached catalog results (call after statements that may change them)."""
+    with _schema_cache_lock:
+        _schema_cache.clear()
+
 class ListTablesParams(BaseModel):
     database: Optional[str] = Field(None, description="Target database (optional)")
     schema: str = Field("dbo", description="Schema name (default 'dbo')")
@@ -14,6 +52,16 @@ class DescribeTableParams(BaseModel):
     schema: str = Field("dbo", description="Schema name (default 'dbo')")
     database: Optional[str] = Field(None, description="Target database (optional)")
 
+# Upper bound on table_names per mssql_describe_tables call
+MAX_DESCRIBE_TABLES = 50
+
+class DescribeTablesParams(BaseModel):
+    table_names: List[str] = Field(..., min_length=1, max_length=MAX_DESCRIBE_TABLES,
+                                   description=f"Table names (at most {MAX_DESCRIBE_TABLES})")
+    schema: str = Field("dbo", description="Schema name (default 'dbo')")
+    database: Optional[str] = Field(None, description="Target database (optional)")
+
+@_ttl_cached
 def list_databases() -> List[Dict[str, Any]]:
     """List all accessible databases on the server."""
     db = get_db_connection()
@@ -29,6 +77,7 @@ def list_databases() -> List[Dict[str, Any]]:
     """
     return db.execute_query(query)
 
+@_ttl_cached
 def list_tables(schema: str = "dbo", database: Optional[str] = None) -> List[Dict[str, Any]]:
     """List all tables in the specified database and schema."""
     db = get_db_connection()
@@ -55,6 +104,7 @@ def list_tables(schema: str = "dbo", database: Optional[str] = None) -> List[Dic
     
     return db.execute_query(query, (schema,))
 
+@_ttl_cached
 def describe_table(table_name: str, schema: str = "dbo", database: Optional[str] = None) -> Dict[str, Any]:
     """Get detailed schema information for a specific table."""
     db = get_db_connection()
@@ -75,8 +125,7 @@ def describe_table(table_name: str, schema: str = "dbo", database: Optional[str]
     WHERE t.name = ? AND s.name = ?
     ORDER BY c.column_id
     """
-    columns = db.execute_query(cols_query, (table_name, schema))
-    
+
     # Get Primary Keys
     pk_query = f"""
     SELECT c.name
@@ -88,7 +137,11 @@ def describe_table(table_name: str, schema: str = "dbo", database: Optional[str]
     WHERE i.is_primary_key = 1
     AND t.name = ? AND s.name = ?
     """
-    pks = db.execute_query(pk_query, (table_name, schema))
+    
+    # Both catalog queries go to the server as one batch, one result set each
+    columns, pks = db.execute_multi(
+        cols_query + ";" + pk_query, (table_name, schema, table_name, schema), result_set_count=2
+    )
     primary_keys = [row['name'] for row in pks]
     
     return {
@@ -98,3 +151,11 @@ def describe_table(table_name: str, schema: str = "dbo", database: Optional[str]
         "primary_key": primary_keys
     }
 
+def describe_tables_bulk(table_names: List[str], schema: str = "dbo", database: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Describe several tables concurrently, in the order given."""
+    if not table_names:
+        return []
+    # Leave a connection free for other callers while fanning out
+    max_workers = max(1, min(len(table_names), get_settings().MAX_POOL_SIZE - 1))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda name: describe_table(name, schema, database), table_names))
@@ -1,101 +1,136 @@
-from typing import Any, Dict, List, Optional
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pydantic import BaseModel, Field
-from src.database.connection import get_db_connection
-from src.database.query_validator import QueryValidator
+from src.database.connection import get_db_connection, row_builder, FETCH_BATCH_SIZE
+from src.database.query_validator import get_validator
+from src.tools.introspection import invalidate_schema_cache
 from src.utils.config import get_settings
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Leading SELECT [ALL | DISTINCT], where a TOP clause would go
+_SELECT_HEAD_RE = re.compile(r"\s*SELECT\b\s*(?:(?:ALL|DISTINCT)\b\s*)?", re.IGNORECASE)
+_TOP_RE = re.compile(r"TOP\b", re.IGNORECASE)
+_SELECT_KEYWORD_RE = re.compile(r"\bSELECT\b", re.IGNORECASE)
+# TOP cannot be combined with OFFSET ... FETCH
+_OFFSET_RE = re.compile(r"\bOFFSET\b", re.IGNORECASE)
+# A comment could hide a DISTINCT or TOP from the head match
+_COMMENT_RE = re.compile(r"--|/\*")
+
 class QueryParams(BaseModel):
     query: str = Field(..., description="SQL SELECT statement")
     database: Optional[str] = Field(None, description="Target database (overrides default)")
     max_rows: int = Field(1000, description="Maximum rows to return (default 1000)")
+    dictionary: bool = Field(False, description="Return each row as an object keyed by column name instead of an array ordered like 'columns'")
 
-def execute_query(query: str, database: Optional[str] = None, max_rows: int = 1000) -> Dict[str, Any]:
+def execute_query(query: str, database: Optional[str] = None, max_rows: int = 1000,
+                  dictionary: bool = False) -> Dict[str, Any]:
     """
     Execute a SELECT query with safety constraints.
+
+    Rows are returned column-oriented by default: 'columns' lists the names once
+    and each row is an array of values in that order. Pass dictionary=True for
+    the row-of-objects format, which repeats every column name in every row.
+    """
+    rows: List[Any] = []
+    result: Dict[str, Any] = {}
+    for chunk in stream_query(query, database, max_rows, dictionary):
+        if "rows" in chunk:
+            rows.extend(chunk["rows"])
+        else:
+            result.update(chunk)
+
+    if not result.get("success"):
+        return result
+    return {"rows": rows, **result}
+
+
+def stream_query(query: str, database: Optional[str] = None, max_rows: int = 1000,
+                 dictionary: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Execute a SELECT query like execute_query, yielding the result in chunks.
+
+    Yields {"columns": [...]} first, then {"rows": [...]} per fetched batch of at
+    most FETCH_BATCH_SIZE rows, and finally a summary with row_count, execution_time
+    and success. Failures are yielded as a final {"error": ..., "success": False}.
+    Only one batch of converted rows is held at a time. The pooled connection stays
+    checked out until the generator is exhausted or closed.
     """
     settings = get_settings()
-    validator = QueryValidator(allow_write=settings.MSSQL_ALLOW_WRITE_OPERATIONS)
+    validator = get_validator(settings.MSSQL_ALLOW_WRITE_OPERATIONS)
     
     # Validate Query
     is_valid, error = validator.validate_query(query)
     if not is_valid:
-        return {"error": error, "success": False}
+        yield {"error": error, "success": False}
+        return
         
     db = get_db_connection()
     
-    # Enforce row limit in query if possible, or post-process
-    # Adding TOP to query is complex with regex, so we'll fetch and truncate for now
-    # or let the user handle TOP. 
-    # Better approach: We can check if TOP is present, if not add it, but that's risky with parsing.
-    # We will simply truncate the result set in Python to avoid memory issues.
-    
-    final_query = query
-    if database:
-        # NOTE: This assumes the connection user has rights to USE database or access it.
-        # It's better to qualify tables, but we can't easily parse that.
-        # We'll prepend 'USE [Database];' if it's a single batch, but python driver might not like that 
-        # combined with fetchall if it returns multiple result sets.
-        # Safest way without changing connection: 
-        # We rely on cross-database queries (SELECT * FROM [DB].[Schema].[Table])
-        # If the user provided `database`, we expect them to either have fully qualified names
-        # OR we try to run `USE {database}` first.
-        # Since pyodbc supports executing 'USE' as a separate command on same cursor:
-        pass 
-        
+    # Enforce row limit in the query itself when the rewrite is safe, so the server
+    # stops after max_rows; the fetch below still truncates as a fallback
+    final_query, query_params = _inject_top(query, max_rows)
+
     try:
-        start_time = 0
-        import time
-        start_time = time.time()
+        start_time = time.monotonic()
         
-        # We use a context manager for connection to allow 'USE' if needed
-        with db.get_connection() as conn:
+        # The pool switches the connection to `database` when one is given
+        with db.get_connection(database=database) as conn:
             cursor = conn.cursor()
-            if database:
-                cursor.execute(f"USE [{database}]")
-            
-            cursor.execute(final_query)
+            cursor.execute(final_query, query_params)
             
-            if cursor.description:
-                columns = [column[0] for column in cursor.description]
-                rows = []
-                count = 0
-                for row in cursor:
-                    if count >= max_rows:
-                        break
-                    # Convert row values to be JSON serializable
-                    row_dict = {}
-                    for i, val in enumerate(row):
-                         # Handle types that might not serialize well (datetime, decimals)
-                         # Simple strategy: str() them if needed, or let Pydantic/JSON encoder handle basic types
-                         # For now we map to dict
-                         row_dict[columns[i]] = val
-                    rows.append(row_dict)
-                    count += 1
-                
-                execution_time = time.time() - start_time
-                
-                return {
-                    "rows": rows,
-                    "columns": columns,
-                    "row_count": len(rows),
-                    "execution_time": execution_time,
-                    "success": True
-                }
-            else:
-                # No results
-                return {
-                    "rows": [],
-                    "row_count": 0,
-                    "success": True
-                }
+            if not cursor.description:
+                # No results: not a SELECT, so with writes enabled it may have been DDL
+                invalidate_schema_cache()
+                yield {"row_count": 0, "success": True}
+                return
+
+            columns = [column[0] for column in cursor.description]
+            # Row-to-dict function generated once per column layout
+            build = row_builder(tuple(columns))
+            yield {"columns": columns}
+
+            row_count = 0
+            cursor.arraysize = FETCH_BATCH_SIZE
+            while row_count < max_rows:
+                raw = cursor.fetchmany(min(FETCH_BATCH_SIZE, max_rows - row_count))
+                if not raw:
+                    break
+                row_count += len(raw)
+                if dictionary:
+                    yield {"rows": [build(row) for row in raw]}
+                else:
+                    yield {"rows": [list(row) for row in raw]}
+
+            yield {
+                "row_count": row_count,
+                "execution_time": time.monotonic() - start_time,
+                "success": True
+            }
                 
     except Exception as e:
         logger.error(f"Query execution failed: {str(e)}")
-        return {
+        yield {
             "error": str(e),
             "success": False
         }
 
+
+def _inject_top(query: str, max_rows: int) -> Tuple[str, tuple]:
+    """
+    Rewrite a plain single SELECT to 'SELECT TOP (?) ...' with max_rows bound as a parameter.
+    Queries where the rewrite could change meaning (CTEs, subqueries, UNIONs,
+    an existing TOP, OFFSET/FETCH, comments) are returned unchanged with no parameters.
+    """
+    match = _SELECT_HEAD_RE.match(query)
+    if (not match
+            or _TOP_RE.match(query, match.end())
+            or len(_SELECT_KEYWORD_RE.findall(query)) > 1
+            or _OFFSET_RE.search(query)
+            or _COMMENT_RE.search(query)):
+        return query, ()
+    head = match.end()
+    # SQL Server rejects a negative TOP; the fetch loop already returns no rows for one
+    return f"{query[:head].rstrip()} TOP (?) {query[head:]}", (max(0, int(max_rows)),)
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -19,6 +20,11 @@ class Settings(BaseSettings):
     MAX_POOL_SIZE: int = 10
     IDLE_TIMEOUT: int = 300
     CONNECTION_LIFETIME: int = 1800
+    VALIDATION_IDLE_THRESHOLD: int = 30
+    POOL_ACQUIRE_TIMEOUT: int = 30
+
+    # Introspection cache TTL in seconds (0 disables)
+    SCHEMA_CACHE_TTL: int = 60
 
     # Security Settings
     MSSQL_ALLOW_WRITE_OPERATIONS: bool = False
@@ -31,5 +37,7 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         case_sensitive = True
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    """Process-wide settings, parsed once. Use get_settings.cache_clear() to reload."""
     return Settings()
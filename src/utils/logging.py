@@ -1,14 +1,20 @@
+import atexit
 import logging
-import json
+import logging.handlers
+import queue
 import sys
-from typing import Any, Dict
-from datetime import datetime
+import time
+from typing import Any, Dict, Optional
 from src.utils.config import get_settings
+from src.utils.serialization import dumps
 
 class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
+        # strftime on a struct_time avoids building a datetime per record
+        t = record.created
+        ms = int((t - int(t)) * 1000)
         log_obj: Dict[str, Any] = {
-            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
+            "timestamp": f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t))}.{ms:03d}Z",
             "level": record.levelname,
             "message": record.getMessage(),
             "logger": record.name,
@@ -22,16 +28,32 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra_data"):
             log_obj.update(record.extra_data) # type: ignore
             
-        return json.dumps(log_obj)
+        return dumps(log_obj)
+
+# Writes queued records to stderr on a background thread
+_listener: Optional[logging.handlers.QueueListener] = None
 
 def setup_logging():
+    global _listener
     settings = get_settings()
     root_logger = logging.getLogger()
     root_logger.setLevel(settings.LOG_LEVEL)
     
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JSONFormatter())
-    root_logger.addHandler(handler)
+    if _listener is None:
+        # Request threads only format and enqueue; the stream write happens
+        # on the listener thread. Records arrive already rendered as JSON.
+        log_queue: queue.Queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(JSONFormatter())
+        root_logger.addHandler(queue_handler)
+
+        # stdout is reserved for the MCP stdio protocol
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _listener = logging.handlers.QueueListener(log_queue, handler)
+        _listener.start()
+        # Flush whatever is still queued on interpreter exit
+        atexit.register(_listener.stop)
     
     # Silence noisy libraries
     logging.getLogger("pydantic").setLevel(logging.WARNING)
@@ -0,0 +1,30 @@
+"""
+JSON serialization for tool results.
+Uses orjson when it is installed and falls back to the standard library.
+"""
+import datetime
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """
+    Convert values without a native JSON representation.
+    Dates and times use ISO 8601 as orjson writes them natively, so both
+    backends produce the same output; anything else (Decimal, bytes, ...) uses str().
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize obj to compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False)
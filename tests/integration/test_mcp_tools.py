@@ -2,108 +2,204 @@
 """
 Automated MCP Server Integration Tests
 This script can be executed by AI tools to validate MCP server functionality
+Requires the mcp client package on the host (pip install -r requirements.txt)
 """
 
+import asyncio
+import copy
 import json
-import subprocess
+import os
 import sys
 import time
-from typing import Dict, Any, List
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# One server process for the whole suite, started inside the test container
+SERVER_PARAMS = StdioServerParameters(
+    command="docker",
+    args=["exec", "-i", "mssql-mcp-test", "python", "-m", "src.server"],
+)
+# Seconds to wait for each tool response
+REQUEST_TIMEOUT = 30
+# Tool calls in flight at once; keeps the server's queue short
+MAX_CONCURRENCY = int(os.environ.get("MCP_TEST_CONCURRENCY", "4"))
+# Opt-in: reuse catalog tool results across runs while the test schema is unchanged
+DISK_CACHE_ENABLED = os.environ.get("MCP_TEST_CACHE") == "1"
+DISK_CACHE_FILE = os.path.join(".pytest_cache", "mcp_tool_cache.json")
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "test-data", "01-init-db.sql")
+
+def _loads(data):
+    """Parse JSON with orjson when installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize JSON to UTF-8 bytes with orjson when installed"""
+    if orjson is not None:
+        option = (orjson.OPT_SORT_KEYS if sort_keys else 0) | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, sort_keys=sort_keys, indent=2 if indent else None).encode()
 
 class MCPTester:
+    __slots__ = (
+        "passed_tests", "skipped_tests", "failed_tests", "container_env",
+        "_test_names", "_test_status", "_test_messages",
+        "exit_stack", "session", "_cache", "_cacheable", "_sem", "_log_buffer",
+    )
+    
     def __init__(self):
         self.passed_tests = 0
+        self.skipped_tests = 0
+        # Environment of the server container, read once at suite start
+        self.container_env: Dict[str, str] = {}
         self.failed_tests = 0
-        self.test_results = []
-        
-    def send_mcp_request(self, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Send MCP request to the server via stdin/stdout"""
-        request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": tool,
-                "arguments": arguments
-            }
-        }
+        # Per-assertion results as parallel lists; see test_results()
+        self._test_names: List[str] = []
+        self._test_status: List[str] = []
+        self._test_messages: List[str] = []
+        self.exit_stack = AsyncExitStack()
+        self.session: Optional[ClientSession] = None
+        # Results of idempotent catalog tools, keyed by (tool, canonical arguments)
+        self._cache: Dict[Tuple[str, bytes], Dict[str, Any]] = {}
+        self._cacheable = {"mssql_list_databases", "mssql_list_tables", "mssql_describe_table"}
+        self._sem = asyncio.Semaphore(MAX_CONCURRENCY)
+        # Test output, written once per phase instead of per assertion
+        self._log_buffer: List[str] = []
+        
+    async def connect(self):
+        """Start the server and open a single MCP session reused by every test"""
+        read, write = await self.exit_stack.enter_async_context(stdio_client(SERVER_PARAMS))
+        self.session = await self.exit_stack.enter_async_context(ClientSession(read, write))
+        await self.session.initialize()
+    
+    async def close(self):
+        """Close the session and stop the server process"""
+        await self.exit_stack.aclose()
+        
+    async def _container_running(self) -> bool:
+        """Cheap precheck before starting the server inside the container"""
+        process = await asyncio.create_subprocess_exec(
+            "docker", "inspect", "--format", "{{.State.Running}}", "mssql-mcp-test",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+        return process.returncode == 0 and stdout.strip() == b"true"
+    
+    async def _container_env(self) -> Dict[str, str]:
+        """Environment variables the server container was started with"""
+        process = await asyncio.create_subprocess_exec(
+            "docker", "inspect", "--format", "{{json .Config.Env}}", "mssql-mcp-test",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+        if process.returncode != 0:
+            return {}
+        return dict(entry.split("=", 1) for entry in _loads(stdout) if "=" in entry)
+    
+    async def _wait_ready(self, timeout: float = 10, interval: float = 0.2) -> bool:
+        """Poll a cheap tool until the server answers with data, up to timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                result = await asyncio.wait_for(
+                    self.session.call_tool("mssql_list_databases", {}), timeout=interval * 5
+                )
+                if not result.isError and result.content and not getattr(result.content[0], "text", "").startswith("Error"):
+                    return True
+            except Exception:
+                pass
+            await asyncio.sleep(interval)
+        return False
+    
+    async def send_mcp_request(self, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool over the open MCP session"""
+        key = (tool, _dumps(arguments, sort_keys=True))
+        if tool in self._cacheable and key in self._cache:
+            return copy.deepcopy(self._cache[key])
         
         try:
-            cmd = [
-                "docker", "exec", "-i", "mssql-mcp-test",
-                "python", "-m", "src.server"
-            ]
-            
-            # Use subprocess to send input to stdin
-            process = subprocess.Popen(
-                cmd, 
-                stdin=subprocess.PIPE, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Send request
-            input_json = json.dumps(request) + "\n"
-            stdout, stderr = process.communicate(input=input_json, timeout=30)
+            async with self._sem:
+                # The timeout covers this call only; the session stays usable after it fires
+                result = await asyncio.wait_for(self.session.call_tool(tool, arguments), timeout=REQUEST_TIMEOUT)
             
-            if process.returncode != 0:
-                 return {"error": f"Process exited with {process.returncode}: {stderr}"}
-                 
-            # Parse output - MCP output might have multiple lines, look for JSON response
-            for line in stdout.splitlines():
+            # Extract the embedded text content which contains the tool result JSON
+            content_block = result.content[0]
+            if content_block.type == "text":
                 try:
-                    data = json.loads(line)
-                    if "result" in data:
-                        # Extract the embedded text content which contains the tool result JSON
-                        content_block = data["result"]["content"][0]
-                        if content_block["type"] == "text":
-                            try:
-                                return json.loads(content_block["text"])
-                            except json.JSONDecodeError:
-                                # It might be a simple string error message
-                                return {"result": content_block["text"]}
+                    data = _loads(content_block.text)
+                    if tool in self._cacheable and "error" not in data:
+                        self._cache[key] = copy.deepcopy(data)
+                    return data
                 except json.JSONDecodeError:
-                    continue
+                    # It might be a simple string error message
+                    return {"result": content_block.text}
                     
-            return {"error": f"No valid JSON response found. Stdout: {stdout[:200]}..."}
+            return {"error": f"Unexpected content type: {content_block.type}"}
             
+        except asyncio.TimeoutError:
+            return {"error": f"No response from {tool} within {REQUEST_TIMEOUT}s"}
         except Exception as e:
             return {"error": str(e)}
     
-    def assert_test(self, test_name: str, condition: bool, message: str = ""):
-        """Assert a test condition and record result"""
+    async def send_mcp_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Issue several tool calls at once over the session; results come back in call order"""
+        return list(await asyncio.gather(
+            *(self.send_mcp_request(tool, arguments) for tool, arguments in calls)
+        ))
+    
+    def log(self, line: str):
+        """Buffer a line of test output; flush_log() writes it"""
+        self._log_buffer.append(line)
+    
+    def flush_log(self):
+        """Write buffered test output in one go"""
+        if self._log_buffer:
+            sys.stdout.write("\n".join(self._log_buffer) + "\n")
+            self._log_buffer.clear()
+    
+    def assert_test(self, test_name: str, condition: bool, message: Union[str, Callable[[], str]] = ""):
+        """
+        Assert a test condition and record result.
+        message may be a callable; it is only evaluated when the assertion fails.
+        """
         if condition:
             self.passed_tests += 1
-            status = "✓ PASS"
-            print(f"{status}: {test_name}")
+            self.log(f"✓ PASS: {test_name}")
+            if callable(message):
+                message = ""
         else:
             self.failed_tests += 1
-            status = "✗ FAIL"
-            print(f"{status}: {test_name}")
+            if callable(message):
+                message = message()
+            self.log(f"✗ FAIL: {test_name}")
             if message:
-                print(f"  → {message}")
+                self.log(f"  → {message}")
         
-        self.test_results.append({
-            "test": test_name,
-            "status": "passed" if condition else "failed",
-            "message": message
-        })
+        self._record(test_name, "passed" if condition else "failed", message)
         
         return condition
     
-    def test_list_databases(self):
+    async def test_list_databases(self):
         """Test 1: List all databases"""
-        print("\n[TEST 1] Testing mssql_list_databases...")
+        self.log("\n[TEST 1] Testing mssql_list_databases...")
         
-        result = self.send_mcp_request("mssql_list_databases", {})
+        result = await self.send_mcp_request("mssql_list_databases", {})
         
         # Validate response structure
         has_databases = isinstance(result.get("databases"), list)
         self.assert_test(
             "List databases returns array",
             has_databases,
-            f"Expected list, got {type(result.get('databases'))} - Result: {result}"
+            lambda: f"Expected list, got {type(result.get('databases'))} - Result: {result}"
         )
         
         # Check TestDB exists
@@ -113,14 +209,14 @@ class MCPTester:
             self.assert_test(
                 "TestDB exists in database list",
                 has_testdb,
-                f"Found databases: {db_names}"
+                lambda: f"Found databases: {db_names}"
             )
     
-    def test_list_tables(self):
+    async def test_list_tables(self):
         """Test 2: List tables in TestDB"""
-        print("\n[TEST 2] Testing mssql_list_tables...")
+        self.log("\n[TEST 2] Testing mssql_list_tables...")
         
-        result = self.send_mcp_request("mssql_list_tables", {
+        result = await self.send_mcp_request("mssql_list_tables", {
             "database": "TestDB",
             "schema": "test"
         })
@@ -142,14 +238,14 @@ class MCPTester:
                 self.assert_test(
                     f"Table 'test.{table}' exists",
                     has_table,
-                    f"Found tables: {table_names}"
+                    lambda: f"Found tables: {table_names}"
                 )
     
-    def test_describe_table(self):
+    async def test_describe_table(self):
         """Test 3: Describe table schema"""
-        print("\n[TEST 3] Testing mssql_describe_table...")
+        self.log("\n[TEST 3] Testing mssql_describe_table...")
         
-        result = self.send_mcp_request("mssql_describe_table", {
+        result = await self.send_mcp_request("mssql_describe_table", {
             "table_name": "Customers",
             "schema": "test",
             "database": "TestDB"
@@ -181,11 +277,35 @@ class MCPTester:
                 has_pk
             )
     
-    def test_simple_query(self):
+    async def test_describe_tables(self):
+        """Test 3b: Describe several tables in one call"""
+        self.log("\n[TEST 3b] Testing mssql_describe_tables...")
+        
+        result = await self.send_mcp_request("mssql_describe_tables", {
+            "table_names": ["Customers", "Orders"],
+            "schema": "test",
+            "database": "TestDB"
+        })
+        
+        tables = result.get("tables")
+        has_tables = isinstance(tables, list) and len(tables) == 2
+        self.assert_test(
+            "Describe tables returns one entry per table",
+            has_tables,
+            lambda: f"Result: {result}"
+        )
+        
+        if has_tables:
+            self.assert_test(
+                "Describe tables preserves request order",
+                [t.get("table") for t in tables] == ["Customers", "Orders"]
+            )
+    
+    async def test_simple_query(self):
         """Test 4: Execute simple SELECT query"""
-        print("\n[TEST 4] Testing mssql_query (simple SELECT)...")
+        self.log("\n[TEST 4] Testing mssql_query (simple SELECT)...")
         
-        result = self.send_mcp_request("mssql_query", {
+        result = await self.send_mcp_request("mssql_query", {
             "query": "SELECT TOP 5 * FROM test.Customers ORDER BY CustomerID",
             "database": "TestDB"
         })
@@ -202,7 +322,7 @@ class MCPTester:
             self.assert_test(
                 "Query returns expected number of rows",
                 row_count == 5,
-                f"Expected 5 rows, got {row_count}"
+                lambda: f"Expected 5 rows, got {row_count}"
             )
             
             # Check execution metadata
@@ -212,9 +332,9 @@ class MCPTester:
                 has_metadata
             )
     
-    def test_join_query(self):
+    async def test_join_query(self):
         """Test 5: Execute JOIN query"""
-        print("\n[TEST 5] Testing mssql_query (JOIN)...")
+        self.log("\n[TEST 5] Testing mssql_query (JOIN)...")
         
         query = """
         SELECT 
@@ -227,7 +347,7 @@ class MCPTester:
         ORDER BY OrderCount DESC
         """
         
-        result = self.send_mcp_request("mssql_query", {
+        result = await self.send_mcp_request("mssql_query", {
             "query": query,
             "database": "TestDB"
         })
@@ -238,11 +358,11 @@ class MCPTester:
             has_rows and len(result["rows"]) > 0
         )
     
-    def test_query_with_limit(self):
+    async def test_query_with_limit(self):
         """Test 6: Test max_rows parameter"""
-        print("\n[TEST 6] Testing query row limit...")
+        self.log("\n[TEST 6] Testing query row limit...")
         
-        result = self.send_mcp_request("mssql_query", {
+        result = await self.send_mcp_request("mssql_query", {
             "query": "SELECT * FROM test.Products",
             "database": "TestDB",
             "max_rows": 3
@@ -253,12 +373,12 @@ class MCPTester:
             self.assert_test(
                 "Row limit is enforced",
                 row_count <= 3,
-                f"Expected max 3 rows, got {row_count}"
+                lambda: f"Expected max 3 rows, got {row_count}"
             )
     
-    def test_sql_injection_prevention(self):
+    async def test_sql_injection_prevention(self):
         """Test 7: SQL injection prevention"""
-        print("\n[TEST 7] Testing SQL injection prevention...")
+        self.log("\n[TEST 7] Testing SQL injection prevention...")
         
         # Attempt SQL injection
         malicious_queries = [
@@ -267,19 +387,16 @@ class MCPTester:
             "SELECT * FROM test.Customers; EXEC sp_executesql N'DROP TABLE test.Customers';"
         ]
         
+        # One at a time: a query already sent cannot be recalled, so stopping at
+        # the first miss keeps a regressed validator from running the rest
         all_blocked = True
         for query in malicious_queries:
-            result = self.send_mcp_request("mssql_query", {
+            result = await self.send_mcp_request("mssql_query", {
                 "query": query,
                 "database": "TestDB"
             })
-            
-            # Should return error, not execute
-            # In our implementation it might return success=False or an error string
-            is_blocked = "error" in result or result.get("success") == False or "Error" in str(result)
-            if not is_blocked:
+            if not self._injection_blocked(query, result):
                 all_blocked = False
-                print(f"Failed to block: {query}")
                 break
         
         self.assert_test(
@@ -288,48 +405,118 @@ class MCPTester:
             "Server should reject multi-statement queries"
         )
     
-    def test_write_operation_blocked(self):
-        """Test 8: Write operations blocked in read-only mode"""
-        # Note: Test container is configured with MSSQL_ALLOW_WRITE_OPERATIONS=true
-        # So we should actually EXPECT writes to succeed if we configured it that way in docker-compose.test.yml
-        # Let's check the docker-compose.test.yml... 
-        # It says: MSSQL_ALLOW_WRITE_OPERATIONS=true
-        # BUT for the standard test, we usually want to test SAFETY. 
-        # However, since we enabled it, we should test that it works, OR we should override it for this test.
-        # It's hard to change env var of running container. 
-        # Let's assume we want to test that write operations WORK when enabled, 
-        # OR we should have set it to false. 
-        # The requirements said "Test write operation restrictions". 
-        # Let's adjust the test to verify write works (since enabled) or skip.
-        
-        # Actually, let's strictly follow the requirements which asked to test restrictions.
-        # But we enabled it in the test compose file. 
-        # Let's change this test to verify write operations work, 
-        # OR we can assume the user might want to test the default (False).
-        # Given the conflict, I will test that it IS allowed as per current config, 
-        # but I'll add a comment. 
-        
-        print("\n[TEST 8] Testing write operations (Enabled in Test Config)...")
-        
-        # Test INSERT
+    def _injection_blocked(self, query: str, result: Dict[str, Any]) -> bool:
+        """True if the server refused the query; logs the query otherwise"""
+        # Should return error, not execute
+        # In our implementation it might return success=False or an error string
+        if "error" in result or result.get("success") is False:
+            return True
+        if "Error" in str(result):
+            return True
+        self.log(f"Failed to block: {query}")
+        return False
+    
+    async def test_write_operation_blocked(self):
+        """Test 8: Write operations follow MSSQL_ALLOW_WRITE_OPERATIONS"""
+        self.log("\n[TEST 8] Testing write operation restrictions...")
+        
+        writes_allowed = self.container_env.get("MSSQL_ALLOW_WRITE_OPERATIONS", "").lower()
+        
+        if writes_allowed == "true":
+            # Known config: a dry run covers the write path without growing the test tables
+            self.skip_test("INSERT is allowed when configured", "writes enabled in container env")
+            result = await self.send_mcp_request("mssql_execute_write", {
+                "statement": "INSERT INTO test.Products (ProductName, Price) VALUES ('DryRun', 10.00)",
+                "database": "TestDB",
+                "dry_run": True
+            })
+            self.assert_test(
+                "Write path validates INSERT when enabled",
+                result.get("success") is True and result.get("validation") == "passed",
+                lambda: f"Result: {result}"
+            )
+            return
+        
         timestamp = int(time.time())
-        result = self.send_mcp_request("mssql_query", {
+        result = await self.send_mcp_request("mssql_query", {
             "query": f"INSERT INTO test.Products (ProductName, Price) VALUES ('TestProd_{timestamp}', 10.00)",
             "database": "TestDB"
         })
         
-        # Since we enabled writes, this should SUCCEED or return "rows_affected"
+        if writes_allowed == "false":
+            self.assert_test(
+                "INSERT is blocked in read-only mode",
+                "error" in result or result.get("success") is False,
+                lambda: f"Result: {result}"
+            )
+            return
+        
+        # Config unknown: the INSERT may have run
+        self.invalidate_cache("mssql_list_tables", "TestDB")
+        
         is_success = result.get("success", True) and "error" not in result
         self.assert_test(
             "INSERT is allowed when configured",
             is_success
         )
     
-    def test_view_query(self):
+    async def test_bulk_write(self):
+        """Test 8b: Multi-row parameterized write"""
+        self.log("\n[TEST 8b] Testing mssql_execute_bulk_write...")
+        
+        writes_allowed = self.container_env.get("MSSQL_ALLOW_WRITE_OPERATIONS", "").lower()
+        timestamp = int(time.time())
+        names = [f"BulkProd_{timestamp}_{i}" for i in range(3)]
+        
+        result = await self.send_mcp_request("mssql_execute_bulk_write", {
+            "statement": "INSERT INTO test.Products (ProductName, Price) VALUES (?, ?)",
+            "rows": [[name, 5.00 + i] for i, name in enumerate(names)],
+            "database": "TestDB"
+        })
+        
+        if writes_allowed == "false":
+            self.assert_test(
+                "Bulk write is blocked in read-only mode",
+                result.get("success") is False and "disabled" in str(result.get("error", "")),
+                lambda: f"Result: {result}"
+            )
+            return
+        
+        try:
+            self.assert_test(
+                "Bulk INSERT writes every row",
+                result.get("success") is True and result.get("row_count") == 3,
+                lambda: f"Result: {result}"
+            )
+        finally:
+            # Remove the rows again so reruns do not grow test.Products
+            if result.get("success") is True:
+                cleanup = await self.send_mcp_request("mssql_execute_bulk_write", {
+                    "statement": "DELETE FROM test.Products WHERE ProductName = ?",
+                    "rows": [[name] for name in names],
+                    "database": "TestDB"
+                })
+                if cleanup.get("success") is not True:
+                    self.log(f"Failed to remove bulk write rows: {cleanup}")
+            self.invalidate_cache("mssql_list_tables", "TestDB")
+        
+        result = await self.send_mcp_request("mssql_execute_bulk_write", {
+            "statement": "INSERT INTO test.Products (ProductName, Price) VALUES (?, ?)",
+            "rows": [["OnlyName"]],
+            "database": "TestDB"
+        })
+        
+        self.assert_test(
+            "Bulk write rejects rows not matching the parameter markers",
+            result.get("success") is False and result.get("validation") == "failed",
+            lambda: f"Result: {result}"
+        )
+    
+    async def test_view_query(self):
         """Test 9: Query against view"""
-        print("\n[TEST 9] Testing query against view...")
+        self.log("\n[TEST 9] Testing query against view...")
         
-        result = self.send_mcp_request("mssql_query", {
+        result = await self.send_mcp_request("mssql_query", {
             "query": "SELECT * FROM test.vw_CustomerOrderSummary",
             "database": "TestDB"
         })
@@ -340,12 +527,12 @@ class MCPTester:
             has_rows and len(result["rows"]) > 0
         )
     
-    def test_connection_resilience(self):
+    async def test_connection_resilience(self):
         """Test 10: Connection error handling"""
-        print("\n[TEST 10] Testing connection error handling...")
+        self.log("\n[TEST 10] Testing connection error handling...")
         
         # Try to connect to non-existent database
-        result = self.send_mcp_request("mssql_query", {
+        result = await self.send_mcp_request("mssql_query", {
             "query": "SELECT 1",
             "database": "NonExistentDB"
         })
@@ -358,7 +545,67 @@ class MCPTester:
             "Should return descriptive error message"
         )
     
-    def run_all_tests(self):
+    def load_disk_cache(self):
+        """Seed the catalog cache from the last run if the schema file is unchanged"""
+        if not DISK_CACHE_ENABLED:
+            return
+        try:
+            with open(DISK_CACHE_FILE, "rb") as f:
+                cached = _loads(f.read())
+            if cached.get("mtime") != os.stat(SCHEMA_FILE).st_mtime:
+                return
+        except (OSError, ValueError):
+            return
+        for entry in cached.get("entries", []):
+            self._cache[(entry["tool"], entry["arguments"].encode())] = entry["result"]
+    
+    def save_disk_cache(self):
+        """Persist the catalog cache, stamped with the schema file's mtime"""
+        if not DISK_CACHE_ENABLED:
+            return
+        try:
+            mtime = os.stat(SCHEMA_FILE).st_mtime
+            os.makedirs(os.path.dirname(DISK_CACHE_FILE), exist_ok=True)
+            with open(DISK_CACHE_FILE, "wb") as f:
+                f.write(_dumps({
+                    "mtime": mtime,
+                    "entries": [
+                        {"tool": tool, "arguments": arguments.decode(), "result": result}
+                        for (tool, arguments), result in self._cache.items()
+                    ]
+                }))
+        except OSError as e:
+            print(f"Could not save tool cache: {e}")
+    
+    def invalidate_cache(self, tool: str, database: str):
+        """Drop cached results of `tool` for `database` after a test changes it"""
+        for key in [k for k in self._cache if k[0] == tool and _loads(k[1]).get("database") == database]:
+            del self._cache[key]
+    
+    def skip_test(self, test_name: str, reason: str):
+        """Record a test that was deliberately not run"""
+        self.skipped_tests += 1
+        self.log(f"- SKIP: {test_name} ({reason})")
+        self._record(test_name, "skipped", reason)
+    
+    def _record(self, test_name: str, status: str, message: str):
+        self._test_names.append(test_name)
+        self._test_status.append(status)
+        self._test_messages.append(message)
+    
+    def test_results(self) -> List[Dict[str, str]]:
+        """Recorded results as one dict per assertion, built on demand"""
+        return [
+            {"test": name, "status": status, "message": message}
+            for name, status, message in zip(self._test_names, self._test_status, self._test_messages)
+        ]
+    
+    def record_exception(self, test_method, error: Exception):
+        """Count a test that raised instead of asserting"""
+        self.log(f"\n✗ EXCEPTION in {test_method.__name__}: {str(error)}")
+        self.failed_tests += 1
+    
+    async def run_all_tests(self):
         """Execute all tests"""
         print("=" * 60)
         print("MCP SERVER INTEGRATION TEST SUITE")
@@ -366,28 +613,64 @@ class MCPTester:
         
         # Wait for services to be ready
         print("\nWaiting for services to be ready...")
-        time.sleep(5)
-        
-        # Run all test methods
-        test_methods = [
+        if not await self._container_running():
+            print("✗ Container mssql-mcp-test is not running")
+            sys.exit(1)
+        self.container_env = await self._container_env()
+        self.load_disk_cache()
+        await self.connect()
+        if not await self._wait_ready(timeout=10, interval=0.2):
+            print("✗ MCP server did not become ready")
+            await self.close()
+            sys.exit(1)
+        
+        # Prefetch the catalog calls of tests 1-3 together; they then read from the cache
+        await self.send_mcp_batch([
+            ("mssql_list_databases", {}),
+            ("mssql_list_tables", {"database": "TestDB", "schema": "test"}),
+            ("mssql_describe_table", {"table_name": "Customers", "schema": "test", "database": "TestDB"})
+        ])
+        
+        # Read-only tests are independent and share the session concurrently.
+        # assert_test never awaits, so the counters need no lock.
+        parallel_safe = [
             self.test_list_databases,
             self.test_list_tables,
             self.test_describe_table,
+            self.test_describe_tables,
             self.test_simple_query,
             self.test_join_query,
             self.test_query_with_limit,
-            self.test_sql_injection_prevention,
-            self.test_write_operation_blocked,
             self.test_view_query,
             self.test_connection_resilience
         ]
+        # Tests that write, or try to, run one at a time afterwards
+        serial = [
+            self.test_sql_injection_prevention,
+            self.test_write_operation_blocked,
+            self.test_bulk_write
+        ]
         
-        for test_method in test_methods:
-            try:
-                test_method()
-            except Exception as e:
-                print(f"\n✗ EXCEPTION in {test_method.__name__}: {str(e)}")
-                self.failed_tests += 1
+        try:
+            outcomes = await asyncio.gather(
+                *(test_method() for test_method in parallel_safe),
+                return_exceptions=True
+            )
+            for test_method, outcome in zip(parallel_safe, outcomes):
+                if isinstance(outcome, Exception):
+                    self.record_exception(test_method, outcome)
+            self.flush_log()
+            
+            for test_method in serial:
+                try:
+                    await test_method()
+                except Exception as e:
+                    self.record_exception(test_method, e)
+        finally:
+            self.flush_log()
+            await self.close()
+        
+        self.save_disk_cache()
         
         # Print summary
         print("\n" + "=" * 60)
@@ -395,23 +678,25 @@ class MCPTester:
         print("=" * 60)
         print(f"Total Tests: {self.passed_tests + self.failed_tests}")
         print(f"✓ Passed: {self.passed_tests}")
+        print(f"- Skipped: {self.skipped_tests}")
         print(f"✗ Failed: {self.failed_tests}")
         if self.passed_tests + self.failed_tests > 0:
             print(f"Success Rate: {(self.passed_tests / (self.passed_tests + self.failed_tests) * 100):.1f}%")
         print("=" * 60)
         
         # Save results to file
-        with open('test-results.json', 'w') as f:
-            json.dump({
+        with open('test-results.json', 'wb') as f:
+            f.write(_dumps({
                 "total": self.passed_tests + self.failed_tests,
                 "passed": self.passed_tests,
+                "skipped": self.skipped_tests,
                 "failed": self.failed_tests,
-                "tests": self.test_results
-            }, f, indent=2)
+                "tests": self.test_results()
+            }, indent=True))
         
         # Exit with appropriate code
         sys.exit(0 if self.failed_tests == 0 else 1)
 
 if __name__ == "__main__":
     tester = MCPTester()
-    tester.run_all_tests()
+    asyncio.run(tester.run_all_tests())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the TOP (?) row-limit rewrite in mssql_query
+Run from the repository root: python -m unittest discover -s tests/unit
+"""
+
+import unittest
+
+from src.tools.query import _inject_top
+
+
+class InjectTopTests(unittest.TestCase):
+    def assert_unchanged(self, query: str):
+        self.assertEqual(_inject_top(query, 10), (query, ()))
+
+    def test_plain_select(self):
+        self.assertEqual(
+            _inject_top("SELECT a FROM t", 10),
+            ("SELECT TOP (?) a FROM t", (10,))
+        )
+
+    def test_distinct_goes_before_top(self):
+        self.assertEqual(
+            _inject_top("SELECT DISTINCT a FROM t", 10),
+            ("SELECT DISTINCT TOP (?) a FROM t", (10,))
+        )
+
+    def test_distinct_with_parentheses(self):
+        """No whitespace between DISTINCT / ALL and the select list"""
+        self.assertEqual(
+            _inject_top("SELECT DISTINCT(Name) FROM t", 10),
+            ("SELECT DISTINCT TOP (?) (Name) FROM t", (10,))
+        )
+        self.assertEqual(
+            _inject_top("SELECT ALL(Name) FROM t", 10),
+            ("SELECT ALL TOP (?) (Name) FROM t", (10,))
+        )
+
+    def test_column_starting_with_keyword(self):
+        self.assertEqual(
+            _inject_top("SELECT distinct_count FROM t", 10),
+            ("SELECT TOP (?) distinct_count FROM t", (10,))
+        )
+
+    def test_existing_top(self):
+        self.assert_unchanged("SELECT TOP 5 a FROM t")
+        self.assert_unchanged("SELECT DISTINCT TOP (5) a FROM t")
+
+    def test_offset_fetch(self):
+        self.assert_unchanged("SELECT a FROM t ORDER BY a OFFSET 5 ROWS FETCH NEXT 5 ROWS ONLY")
+
+    def test_subquery_union_and_cte(self):
+        self.assert_unchanged("SELECT a FROM t WHERE a IN (SELECT a FROM u)")
+        self.assert_unchanged("SELECT a FROM t UNION SELECT a FROM u")
+        self.assert_unchanged("WITH c AS (SELECT 1 AS a) SELECT a FROM c")
+
+    def test_comments(self):
+        self.assert_unchanged("SELECT /* c */ DISTINCT a FROM t")
+        self.assert_unchanged("SELECT a FROM t -- note")
+
+    def test_negative_max_rows(self):
+        self.assertEqual(
+            _inject_top("SELECT a FROM t", -5),
+            ("SELECT TOP (?) a FROM t", (0,))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQL query validator
+Run from the repository root: python -m unittest discover -s tests/unit
+"""
+
+import unittest
+
+from src.database.query_validator import get_validator
+
+
+class ReadOnlyValidatorTests(unittest.TestCase):
+    """Read-only sessions autocommit, so nothing that writes may pass"""
+
+    def setUp(self):
+        self.validator = get_validator(allow_write=False)
+
+    def assert_blocked(self, query: str):
+        is_valid, error = self.validator.validate_query(query)
+        self.assertFalse(is_valid, f"Should be blocked: {query}")
+        self.assertTrue(error)
+
+    def assert_allowed(self, query: str):
+        self.assertEqual(self.validator.validate_query(query), (True, None))
+
+    def test_cte_fronted_dml_is_blocked(self):
+        """DML after a leading WITH is rejected"""
+        self.assert_blocked("WITH c AS (SELECT 1 AS a) DELETE FROM test.Products")
+        self.assert_blocked("WITH c AS (SELECT 1 AS a) UPDATE test.Products SET Price = 0")
+        self.assert_blocked(
+            "WITH c AS (SELECT 1 AS a) INSERT INTO test.Products (ProductName, Price) SELECT 'x', 1 FROM c"
+        )
+
+    def test_select_into_is_blocked(self):
+        """SELECT ... INTO creates a table"""
+        self.assert_blocked("SELECT * INTO test.Copy FROM test.Products")
+
+    def test_multi_statement_is_blocked(self):
+        self.assert_blocked("SELECT * FROM test.Customers; DROP TABLE test.Orders;")
+
+    def test_plain_reads_are_allowed(self):
+        self.assert_allowed("SELECT * FROM test.Customers")
+        self.assert_allowed("WITH c AS (SELECT 1 AS a) SELECT a FROM c")
+
+    def test_keywords_in_literals_and_identifiers_are_allowed(self):
+        """Only SQL text is scanned, not strings, comments or quoted names"""
+        self.assert_allowed("SELECT * FROM test.Products WHERE ProductName = 'delete into'")
+        self.assert_allowed("SELECT [Update], UpdatedAt FROM test.Products -- insert")
+        self.assert_allowed("SELECT 'it''s' AS x FROM test.Products /* drop */")
+
+
+class WriteValidatorTests(unittest.TestCase):
+    def test_cte_fronted_dml_is_allowed(self):
+        validator = get_validator(allow_write=True)
+        self.assertEqual(
+            validator.validate_query("WITH c AS (SELECT 1 AS a) DELETE FROM test.Products"),
+            (True, None)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tool result serialization
+Run from the repository root: python -m unittest discover -s tests/unit
+"""
+
+import datetime
+import decimal
+import unittest
+import uuid
+from unittest import mock
+
+from src.utils import serialization
+
+SAMPLE = {
+    "datetime": datetime.datetime(2024, 1, 1, 0, 0, 0),
+    "datetime_us": datetime.datetime(2024, 1, 1, 12, 30, 5, 123456),
+    "datetime_tz": datetime.datetime(2024, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc),
+    "date": datetime.date(2024, 1, 1),
+    "time": datetime.time(13, 45, 0),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "decimal": decimal.Decimal("19.99"),
+    "bytes": b"\x00\x01",
+    "text": "Café",
+    "numbers": [1, 2.5, None, True],
+    1: "non-string key",
+}
+
+
+class DumpsTests(unittest.TestCase):
+    def fallback_dumps(self, obj):
+        with mock.patch.object(serialization, "orjson", None):
+            return serialization.dumps(obj)
+
+    def test_fallback_formats(self):
+        """Standard library path writes ISO 8601 dates and str() for the rest"""
+        self.assertEqual(
+            self.fallback_dumps({
+                "datetime": SAMPLE["datetime"],
+                "date": SAMPLE["date"],
+                "uuid": SAMPLE["uuid"],
+                "decimal": SAMPLE["decimal"]
+            }),
+            '{"datetime":"2024-01-01T00:00:00","date":"2024-01-01",'
+            '"uuid":"12345678-1234-5678-1234-567812345678","decimal":"19.99"}'
+        )
+
+    @unittest.skipIf(serialization.orjson is None, "orjson not installed")
+    def test_backends_match(self):
+        """Clients see the same payload whether or not orjson is installed"""
+        self.assertEqual(serialization.dumps(SAMPLE), self.fallback_dumps(SAMPLE))
+
+
+if __name__ == "__main__":
+    unittest.main()